@@ -3,19 +3,28 @@ AgentCore agent with comprehensive AWS MCP servers integration
 """
 import os
 import json
+import time
 import asyncio
-from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from bedrock_agentcore.memory import MemoryClient
 from strands import Agent
-from strands.hooks import AgentInitializedEvent, HookProvider, MessageAddedEvent
+from common.llm_cache import LLMCache
+from common.mcp_pool import mcp_pool, run_async
+from common.memory_hook import MemoryHook
 
 app = BedrockAgentCoreApp()
 memory_client = MemoryClient(region_name='us-west-2')
 MEMORY_ID = os.getenv('MEMORY_ID')
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+llm_cache = LLMCache(MODEL_ID)
+
+# Discovered tool catalog, reused across invocations until it is older than MCP_TOOL_TTL seconds
+MCP_TOOL_TTL = float(os.getenv('MCP_TOOL_TTL', '300'))
+_TOOLS_CACHE = {"ts": 0.0, "tools": None}
 
 # AWS MCP Servers Configuration
+# Servers launched locally can instead use "transport": "stdio" with "cmd": [...]
+# to keep one long-lived pipe rather than an HTTP connection
 AWS_MCP_SERVERS = {
     "aws_diagram": {
         "url": "http://localhost:8000/mcp",
@@ -39,86 +48,63 @@ AWS_MCP_SERVERS = {
     }
 }
 
-class MemoryHook(HookProvider):
-    def on_agent_initialized(self, event):
-        if not MEMORY_ID: return
-        turns = memory_client.get_last_k_turns(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            k=3
-        )
-        if turns:
-            context = "\n".join([f"{m['role']}: {m['content']['text']}" 
-                               for t in turns for m in t])
-            event.agent.system_prompt += f"\n\nPrevious:\n{context}"
-
-    def on_message_added(self, event):
-        if not MEMORY_ID: return
-        msg = event.agent.messages[-1]
-        memory_client.create_event(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            messages=[(str(msg["content"]), msg["role"])]
-        )
-
-    def register_hooks(self, registry):
-        registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
-        registry.add_callback(MessageAddedEvent, self.on_message_added)
+# Build each server's request headers once rather than on every connection
+for _config in AWS_MCP_SERVERS.values():
+    _config["_headers"] = {"Authorization": f"Bearer {_config['auth']}"} if _config.get("auth") else {}
+
+# Prefixed tool name -> (server name, original tool name), filled in during discovery
+TOOL_ROUTE = {}
+
+def server_request(config: dict, op):
+    """Run op(session) on a server's pooled session, over stdio when its transport is stdio"""
+    cmd = config["cmd"] if config.get("transport") == "stdio" else None
+    return mcp_pool.request(op, config.get("url"), config["_headers"], cmd)
 
 async def connect_to_mcp_server(server_name: str, config: dict):
     """Connect to a single MCP server and get its tools"""
     try:
-        async with streamablehttp_client(config["url"]) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                tools_result = await session.list_tools()
-                
-                # Prefix tool names with server name to avoid conflicts
-                prefixed_tools = []
-                for tool in tools_result.tools:
-                    tool.name = f"{server_name}_{tool.name}"
-                    prefixed_tools.append(tool)
-                
-                print(f"✅ Connected to {server_name}: {len(prefixed_tools)} tools")
-                return prefixed_tools
+        tools_result = await server_request(config, lambda session: session.list_tools())
+        
+        # Prefix tool names with server name to avoid conflicts
+        prefixed_tools = []
+        for tool in tools_result.tools:
+            original_name = tool.name
+            tool.name = f"{server_name}_{original_name}"
+            TOOL_ROUTE[tool.name] = (server_name, original_name)
+            prefixed_tools.append(tool)
+        
+        print(f"✅ Connected to {server_name}: {len(prefixed_tools)} tools")
+        return prefixed_tools
     except Exception as e:
         print(f"❌ Failed to connect to {server_name}: {e}")
         return []
 
 async def get_all_aws_mcp_tools():
     """Connect to all AWS MCP servers and collect tools"""
-    all_tools = []
-    
-    for server_name, config in AWS_MCP_SERVERS.items():
-        tools = await connect_to_mcp_server(server_name, config)
-        all_tools.extend(tools)
+    # Contact every server concurrently so startup costs the slowest handshake, not the sum
+    tasks = [connect_to_mcp_server(name, config) for name, config in AWS_MCP_SERVERS.items()]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    return all_tools
+    return [tool for result in results if isinstance(result, list) for tool in result]
 
 async def execute_aws_mcp_tool(tool_name: str, arguments: dict):
     """Execute a tool on the appropriate AWS MCP server"""
-    # Extract server name from prefixed tool name
-    server_name = tool_name.split('_')[0] + '_' + tool_name.split('_')[1]
-    original_tool_name = '_'.join(tool_name.split('_')[2:])
+    route = TOOL_ROUTE.get(tool_name)
+    if not route:
+        return f"Tool {tool_name} not found"
+    server_name, original_tool_name = route
     
-    config = AWS_MCP_SERVERS.get(server_name)
-    if not config:
-        return f"Server {server_name} not found"
+    config = AWS_MCP_SERVERS[server_name]
     
     try:
-        async with streamablehttp_client(config["url"]) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(original_tool_name, arguments)
-                return result.content[0].text if result.content else "No result"
+        result = await server_request(config, lambda session: session.call_tool(original_tool_name, arguments))
+        return result.content[0].text if result.content else "No result"
     except Exception as e:
         return f"Tool execution error: {str(e)}"
 
 # Create agent with enhanced system prompt
 agent = Agent(
-    model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+    model=MODEL_ID,
     system_prompt="""You're an AWS expert assistant with access to comprehensive AWS tools:
 
 🏗️ AWS DIAGRAM TOOLS:
@@ -148,7 +134,7 @@ agent = Agent(
 - Search repositories and get file contents
 
 Use these tools to help users with AWS infrastructure, cost optimization, EKS management, and GitHub operations.""",
-    hooks=[MemoryHook()] if MEMORY_ID else [],
+    hooks=[MemoryHook(memory_client, MEMORY_ID)] if MEMORY_ID else [],
     state={"session_id": "default"}
 )
 
@@ -158,19 +144,30 @@ def invoke(payload, context):
     if hasattr(context, 'session_id'):
         agent.state.set("session_id", context.session_id)
     
-    # Load tools from all AWS MCP servers
-    try:
-        aws_tools = asyncio.run(get_all_aws_mcp_tools())
-        if aws_tools:
-            agent.tools = aws_tools
-            print(f"🚀 Loaded {len(aws_tools)} AWS MCP tools")
-        else:
-            print("⚠️ No AWS MCP tools loaded - servers may not be running")
-    except Exception as e:
-        print(f"❌ Error loading AWS MCP tools: {e}")
+    # Load tools from all AWS MCP servers; a fresh cached catalog is already bound to the agent
+    if not (_TOOLS_CACHE["tools"] and time.monotonic() - _TOOLS_CACHE["ts"] < MCP_TOOL_TTL):
+        try:
+            aws_tools = run_async(get_all_aws_mcp_tools())
+            _TOOLS_CACHE.update(ts=time.monotonic(), tools=aws_tools)
+            if aws_tools:
+                agent.tools = aws_tools
+                print(f"🚀 Loaded {len(aws_tools)} AWS MCP tools")
+            else:
+                print("⚠️ No AWS MCP tools loaded - servers may not be running")
+        except Exception as e:
+            print(f"❌ Error loading AWS MCP tools: {e}")
+    
+    prompt = payload.get("prompt", "Hello! I'm your AWS expert assistant.")
+    cache_key = llm_cache.key(agent, prompt)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        llm_cache.record(agent, prompt, cached)
+        return cached
     
-    response = agent(payload.get("prompt", "Hello! I'm your AWS expert assistant."))
-    return response.message['content'][0]['text']
+    response = agent(prompt)
+    text = response.message['content'][0]['text']
+    llm_cache.set(cache_key, agent, prompt, text)
+    return text
 
 if __name__ == "__main__":
     app.run()
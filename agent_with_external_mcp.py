@@ -3,19 +3,28 @@ AgentCore agent connecting to external MCP servers via Gateway
 """
 import os
 import json
+import time
 import asyncio
-from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from bedrock_agentcore.memory import MemoryClient
 from strands import Agent
-from strands.hooks import AgentInitializedEvent, HookProvider, MessageAddedEvent
+from common.llm_cache import LLMCache
+from common.mcp_pool import mcp_pool, run_async
+from common.memory_hook import MemoryHook
 
 app = BedrockAgentCoreApp()
 memory_client = MemoryClient(region_name='us-west-2')
 MEMORY_ID = os.getenv('MEMORY_ID')
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+llm_cache = LLMCache(MODEL_ID)
+
+# Discovered tool catalog, reused across invocations until it is older than MCP_TOOL_TTL seconds
+MCP_TOOL_TTL = float(os.getenv('MCP_TOOL_TTL', '300'))
+_TOOLS_CACHE = {"ts": 0.0, "tools": None}
 
 # Configuration for multiple MCP servers
+# Servers launched locally can instead use "transport": "stdio" with "cmd": [...]
+# to keep one long-lived pipe rather than an HTTP connection
 MCP_SERVERS = {
     "filesystem": {
         "url": "http://localhost:8001/mcp",  # Local MCP server
@@ -31,91 +40,65 @@ MCP_SERVERS = {
     }
 }
 
-class MemoryHook(HookProvider):
-    def on_agent_initialized(self, event):
-        if not MEMORY_ID: return
-        turns = memory_client.get_last_k_turns(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            k=3
-        )
-        if turns:
-            context = "\n".join([f"{m['role']}: {m['content']['text']}" 
-                               for t in turns for m in t])
-            event.agent.system_prompt += f"\n\nPrevious:\n{context}"
+# Build each server's request headers once rather than on every connection
+for _config in MCP_SERVERS.values():
+    _config["_headers"] = {"Authorization": f"Bearer {_config['auth']}"} if _config.get("auth") else {}
+
+# Prefixed tool name -> (server name, original tool name), filled in during discovery
+TOOL_ROUTE = {}
 
-    def on_message_added(self, event):
-        if not MEMORY_ID: return
-        msg = event.agent.messages[-1]
-        memory_client.create_event(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            messages=[(str(msg["content"]), msg["role"])]
-        )
+def server_request(config: dict, op):
+    """Run op(session) on a server's pooled session, over stdio when its transport is stdio"""
+    cmd = config["cmd"] if config.get("transport") == "stdio" else None
+    return mcp_pool.request(op, config.get("url"), config["_headers"], cmd)
 
-    def register_hooks(self, registry):
-        registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
-        registry.add_callback(MessageAddedEvent, self.on_message_added)
+async def connect_to_mcp_server(server_name: str, config: dict):
+    """Connect to a single MCP server and get its prefixed tools"""
+    try:
+        tools_result = await server_request(config, lambda session: session.list_tools())
+        
+        # Add server prefix to tool names to avoid conflicts
+        prefixed_tools = []
+        for tool in tools_result.tools:
+            original_name = tool.name
+            tool.name = f"{server_name}_{original_name}"
+            TOOL_ROUTE[tool.name] = (server_name, original_name)
+            prefixed_tools.append(tool)
+        
+        print(f"Connected to {server_name}: {len(prefixed_tools)} tools")
+        return prefixed_tools
+    except Exception as e:
+        print(f"Failed to connect to {server_name}: {e}")
+        return []
 
 async def get_mcp_tools_from_servers():
-    """Connect to multiple MCP servers and collect all tools"""
-    all_tools = []
+    """Connect to multiple MCP servers concurrently and collect all tools"""
+    tasks = [connect_to_mcp_server(name, config)
+             for name, config in MCP_SERVERS.items() if config.get("url") or config.get("cmd")]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    for server_name, config in MCP_SERVERS.items():
-        if not config["url"]:
-            continue
-            
-        try:
-            headers = {}
-            if config["auth"]:
-                headers["Authorization"] = f"Bearer {config['auth']}"
-            
-            async with streamablehttp_client(config["url"], headers=headers) as (read, write, _):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    tools_result = await session.list_tools()
-                    
-                    # Add server prefix to tool names to avoid conflicts
-                    for tool in tools_result.tools:
-                        tool.name = f"{server_name}_{tool.name}"
-                        all_tools.append(tool)
-                    
-                    print(f"Connected to {server_name}: {len(tools_result.tools)} tools")
-        except Exception as e:
-            print(f"Failed to connect to {server_name}: {e}")
-    
-    return all_tools
+    return [tool for result in results if isinstance(result, list) for tool in result]
 
 async def execute_mcp_tool(tool_name: str, arguments: dict):
     """Execute a tool on the appropriate MCP server"""
-    # Extract server name from tool name
-    server_name = tool_name.split('_')[0]
-    original_tool_name = '_'.join(tool_name.split('_')[1:])
+    route = TOOL_ROUTE.get(tool_name)
+    if not route:
+        return f"Tool {tool_name} not available"
+    server_name, original_tool_name = route
     
-    config = MCP_SERVERS.get(server_name)
-    if not config or not config["url"]:
-        return f"Server {server_name} not available"
+    config = MCP_SERVERS[server_name]
     
     try:
-        headers = {}
-        if config["auth"]:
-            headers["Authorization"] = f"Bearer {config['auth']}"
-        
-        async with streamablehttp_client(config["url"], headers=headers) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(original_tool_name, arguments)
-                return result.content[0].text if result.content else "No result"
+        result = await server_request(config, lambda session: session.call_tool(original_tool_name, arguments))
+        return result.content[0].text if result.content else "No result"
     except Exception as e:
         return f"Tool execution error: {str(e)}"
 
 # Create agent
 agent = Agent(
-    model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+    model=MODEL_ID,
     system_prompt="You're a helpful assistant with access to multiple MCP servers for various capabilities.",
-    hooks=[MemoryHook()] if MEMORY_ID else [],
+    hooks=[MemoryHook(memory_client, MEMORY_ID)] if MEMORY_ID else [],
     state={"session_id": "default"}
 )
 
@@ -125,17 +108,28 @@ def invoke(payload, context):
     if hasattr(context, 'session_id'):
         agent.state.set("session_id", context.session_id)
     
-    # Get tools from all MCP servers
-    try:
-        external_tools = asyncio.run(get_mcp_tools_from_servers())
-        if external_tools:
-            agent.tools = external_tools
-            print(f"Loaded {len(external_tools)} tools from external MCP servers")
-    except Exception as e:
-        print(f"Error loading external tools: {e}")
+    # Get tools from all MCP servers; a fresh cached catalog is already bound to the agent
+    if not (_TOOLS_CACHE["tools"] and time.monotonic() - _TOOLS_CACHE["ts"] < MCP_TOOL_TTL):
+        try:
+            external_tools = run_async(get_mcp_tools_from_servers())
+            _TOOLS_CACHE.update(ts=time.monotonic(), tools=external_tools)
+            if external_tools:
+                agent.tools = external_tools
+                print(f"Loaded {len(external_tools)} tools from external MCP servers")
+        except Exception as e:
+            print(f"Error loading external tools: {e}")
+    
+    prompt = payload.get("prompt", "Hello")
+    cache_key = llm_cache.key(agent, prompt)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        llm_cache.record(agent, prompt, cached)
+        return cached
     
-    response = agent(payload.get("prompt", "Hello"))
-    return response.message['content'][0]['text']
+    response = agent(prompt)
+    text = response.message['content'][0]['text']
+    llm_cache.set(cache_key, agent, prompt, text)
+    return text
 
 if __name__ == "__main__":
     app.run()
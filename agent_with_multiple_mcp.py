@@ -2,40 +2,41 @@
 AgentCore agent with multiple MCP tools integrated
 """
 import os
-import json
-import requests
-import subprocess
+import shutil
+import getpass
+import threading
+from datetime import datetime
+import orjson
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from bedrock_agentcore.memory import MemoryClient
 from bedrock_agentcore.mcp import MCPServer
 from strands import Agent
-from strands.hooks import AgentInitializedEvent, HookProvider, MessageAddedEvent
+from common.llm_cache import LLMCache
+from common.memory_hook import MemoryHook
+from common.web_tools import fetch, fetch_many, search
 
 app = BedrockAgentCoreApp()
 mcp_server = MCPServer()
 memory_client = MemoryClient(region_name='us-west-2')
 MEMORY_ID = os.getenv('MEMORY_ID')
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+llm_cache = LLMCache(MODEL_ID)
 
 # Internet Data Fetching Tools
 @mcp_server.tool()
 def fetch_url_data(url: str) -> str:
     """Fetch data from a URL"""
-    try:
-        response = requests.get(url, timeout=10)
-        return response.text[:1000]
-    except Exception as e:
-        return f"Error fetching {url}: {str(e)}"
+    return fetch(url)
+
+@mcp_server.tool()
+def fetch_urls_bulk(urls: list) -> str:
+    """Fetch several URLs concurrently; returns a JSON object of url -> content"""
+    return fetch_many(urls)
 
 @mcp_server.tool()
 def search_web(query: str) -> str:
     """Search the web using DuckDuckGo API"""
-    try:
-        url = f"https://api.duckduckgo.com/?q={query}&format=json&no_html=1"
-        response = requests.get(url, timeout=10)
-        data = response.json()
-        return data.get('AbstractText', 'No results found')[:500]
-    except Exception as e:
-        return f"Search error: {str(e)}"
+    return search(query)
 
 # File System Tools
 @mcp_server.tool()
@@ -51,30 +52,63 @@ def read_file(file_path: str) -> str:
 def list_directory(directory_path: str) -> str:
     """List contents of a directory"""
     try:
-        import os
         files = os.listdir(directory_path)
-        return json.dumps(files[:20])  # Limit to 20 files
+        return orjson.dumps(files[:20]).decode()  # Limit to 20 files
     except Exception as e:
         return f"Error listing directory: {str(e)}"
 
 # System Tools
+# Whitelist safe commands, resolved to absolute paths once
+SAFE_COMMANDS = ['ls', 'pwd', 'date', 'whoami', 'df', 'free']
+_CMD_PATHS = {cmd: shutil.which(cmd) for cmd in SAFE_COMMANDS}
+
+# Argument-less commands answered in-process without spawning anything
+_NATIVE_COMMANDS = {
+    'pwd': os.getcwd,
+    'whoami': getpass.getuser,
+    'date': lambda: datetime.now().ctime(),
+}
+
 @mcp_server.tool()
 def run_command(command: str) -> str:
     """Execute a system command (restricted)"""
-    # Whitelist safe commands
-    safe_commands = ['ls', 'pwd', 'date', 'whoami', 'df', 'free']
     cmd_parts = command.split()
     
-    if not cmd_parts or cmd_parts[0] not in safe_commands:
-        return "Command not allowed. Safe commands: " + ", ".join(safe_commands)
+    if not cmd_parts or cmd_parts[0] not in SAFE_COMMANDS:
+        return "Command not allowed. Safe commands: " + ", ".join(SAFE_COMMANDS)
     
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=5)
+        if len(cmd_parts) == 1 and cmd_parts[0] in _NATIVE_COMMANDS:
+            return _NATIVE_COMMANDS[cmd_parts[0]]()[:500]
+        
+        path = _CMD_PATHS[cmd_parts[0]]
+        if not path:
+            return f"Command not available: {cmd_parts[0]}"
+        
+        # Exec directly rather than through a shell; subprocess is only imported if a command runs
+        import subprocess
+        result = subprocess.run([path, *cmd_parts[1:]], capture_output=True, text=True, timeout=5)
         return result.stdout[:500] if result.stdout else result.stderr[:500]
     except Exception as e:
         return f"Command error: {str(e)}"
 
 # Database Tools (SQLite example)
+# One in-memory database for the demo, created and seeded on first use
+_DB = None
+_DB_LOCK = threading.Lock()
+
+def _get_db():
+    """Return the shared demo database; call with _DB_LOCK held"""
+    global _DB
+    if _DB is None:
+        import sqlite3
+        _DB = sqlite3.connect(':memory:', check_same_thread=False)
+        _DB.execute('''CREATE TABLE users (id INTEGER, name TEXT, email TEXT)''')
+        _DB.execute('''INSERT INTO users VALUES (1, 'John', 'john@example.com')''')
+        _DB.execute('''INSERT INTO users VALUES (2, 'Jane', 'jane@example.com')''')
+        _DB.commit()
+    return _DB
+
 @mcp_server.tool()
 def query_database(query: str) -> str:
     """Execute a SQLite query (read-only)"""
@@ -82,77 +116,46 @@ def query_database(query: str) -> str:
         return "Only SELECT queries are allowed"
     
     try:
-        import sqlite3
-        # Use in-memory database for demo
-        conn = sqlite3.connect(':memory:')
-        cursor = conn.cursor()
+        with _DB_LOCK:
+            results = _get_db().execute(query).fetchall()
         
-        # Create sample table
-        cursor.execute('''CREATE TABLE users (id INTEGER, name TEXT, email TEXT)''')
-        cursor.execute('''INSERT INTO users VALUES (1, 'John', 'john@example.com')''')
-        cursor.execute('''INSERT INTO users VALUES (2, 'Jane', 'jane@example.com')''')
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        
-        return json.dumps(results)
+        return orjson.dumps(results).decode()
     except Exception as e:
         return f"Database error: {str(e)}"
 
-# Memory Hook (same as before)
-class MemoryHook(HookProvider):
-    def on_agent_initialized(self, event):
-        if not MEMORY_ID: return
-        turns = memory_client.get_last_k_turns(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            k=3
-        )
-        if turns:
-            context = "\n".join([f"{m['role']}: {m['content']['text']}" 
-                               for t in turns for m in t])
-            event.agent.system_prompt += f"\n\nPrevious:\n{context}"
-
-    def on_message_added(self, event):
-        if not MEMORY_ID: return
-        msg = event.agent.messages[-1]
-        memory_client.create_event(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            messages=[(str(msg["content"]), msg["role"])]
-        )
-
-    def register_hooks(self, registry):
-        registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
-        registry.add_callback(MessageAddedEvent, self.on_message_added)
-
 # Create agent with all tools
 agent = Agent(
-    model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+    model=MODEL_ID,
     system_prompt="You're a helpful assistant with internet access, file system access, and database capabilities.",
-    hooks=[MemoryHook()] if MEMORY_ID else [],
+    hooks=[MemoryHook(memory_client, MEMORY_ID)] if MEMORY_ID else [],
     state={"session_id": "default"}
 )
 
+# Add all MCP tools to agent once; the list never changes between invocations
+agent.tools = [
+    fetch_url_data, fetch_urls_bulk, search_web,  # Internet tools
+    read_file, list_directory,       # File system tools
+    run_command,                     # System tools
+    query_database                   # Database tools
+]
+
 @app.entrypoint
 def invoke(payload, context):
     """Main entry point with all MCP tools"""
     if hasattr(context, 'session_id'):
         agent.state.set("session_id", context.session_id)
     
-    # Add all MCP tools to agent
-    agent.tools = [
-        fetch_url_data, search_web,      # Internet tools
-        read_file, list_directory,       # File system tools
-        run_command,                     # System tools
-        query_database                   # Database tools
-    ]
+    prompt = payload.get("prompt", "Hello")
+    cache_key = llm_cache.key(agent, prompt)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        llm_cache.record(agent, prompt, cached)
+        return cached
     
-    response = agent(payload.get("prompt", "Hello"))
-    return response.message['content'][0]['text']
+    response = agent(prompt)
+    text = response.message['content'][0]['text']
+    llm_cache.set(cache_key, agent, prompt, text)
+    return text
 
 if __name__ == "__main__":
     app.run()
@@ -2,104 +2,110 @@
 AgentCore agent with official AWS MCP servers integration
 """
 import os
-import json
+import orjson
+import time
 import asyncio
-import subprocess
-from mcp import ClientSession
-from mcp.client.stdio import stdio_client
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from bedrock_agentcore.memory import MemoryClient
 from strands import Agent
-from strands.hooks import AgentInitializedEvent, HookProvider, MessageAddedEvent
+from common.llm_cache import LLMCache
+from common.mcp_pool import mcp_pool, run_async
+from common.memory_hook import MemoryHook
 
 app = BedrockAgentCoreApp()
 memory_client = MemoryClient(region_name='us-west-2')
 MEMORY_ID = os.getenv('MEMORY_ID')
+MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+llm_cache = LLMCache(MODEL_ID)
 
-class MemoryHook(HookProvider):
-    def on_agent_initialized(self, event):
-        if not MEMORY_ID: return
-        turns = memory_client.get_last_k_turns(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            k=3
-        )
-        if turns:
-            context = "\n".join([f"{m['role']}: {m['content']['text']}" 
-                               for t in turns for m in t])
-            event.agent.system_prompt += f"\n\nPrevious:\n{context}"
+# Discovered tool catalog, reused across invocations until it is older than MCP_TOOL_TTL seconds
+MCP_TOOL_TTL = float(os.getenv('MCP_TOOL_TTL', '300'))
+_TOOLS_CACHE = {"ts": 0.0, "tools": None}
 
-    def on_message_added(self, event):
-        if not MEMORY_ID: return
-        msg = event.agent.messages[-1]
-        memory_client.create_event(
-            memory_id=MEMORY_ID,
-            actor_id="user",
-            session_id=event.agent.state.get("session_id", "default"),
-            messages=[(str(msg["content"]), msg["role"])]
-        )
+# Server configuration written by setup_aws_official_mcp.py, parsed once per file change
+MCP_CONFIG_PATH = 'aws_mcp_config.json'
+_SERVER_CONFIG = {"mtime": None, "servers": None}
 
-    def register_hooks(self, registry):
-        registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
-        registry.add_callback(MessageAddedEvent, self.on_message_added)
+# Entry point file -> interpreter, in order of preference
+_ENTRY_POINTS = (("main.py", "python"), ("index.js", "node"), ("server.py", "python"))
+
+# server path -> launch command; only found commands are kept, so a checkout that is missing
+# or incomplete is scanned again on the next discovery
+_CMDS = {}
+
+def _cmd_for(server_path: str):
+    """Launch command for a server checkout, from one directory scan, or None if it has no entry point"""
+    cmd = _CMDS.get(server_path)
+    if cmd:
+        return cmd
+    try:
+        with os.scandir(server_path) as it:
+            entries = {e.name for e in it}
+    except OSError:
+        return None
+    for filename, interpreter in _ENTRY_POINTS:
+        if filename in entries:
+            cmd = _CMDS[server_path] = (interpreter, f"{server_path}/{filename}")
+            return cmd
+    return None
 
 async def connect_to_aws_mcp_server(server_name: str, server_path: str):
     """Connect to official AWS MCP server via stdio"""
     try:
         # Start the MCP server process
-        if os.path.exists(f"{server_path}/main.py"):
-            cmd = ["python", f"{server_path}/main.py"]
-        elif os.path.exists(f"{server_path}/index.js"):
-            cmd = ["node", f"{server_path}/index.js"]
-        elif os.path.exists(f"{server_path}/server.py"):
-            cmd = ["python", f"{server_path}/server.py"]
-        else:
+        cmd = _cmd_for(server_path)
+        if not cmd:
             print(f"❌ No executable found for {server_name}")
             return []
         
-        async with stdio_client(cmd) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                
-                # Get available tools
-                tools_result = await session.list_tools()
-                
-                # Prefix tool names with server name
-                prefixed_tools = []
-                for tool in tools_result.tools:
-                    tool.name = f"{server_name}_{tool.name}"
-                    prefixed_tools.append(tool)
-                
-                print(f"✅ Connected to {server_name}: {len(prefixed_tools)} tools")
-                return prefixed_tools
-                
+        # Get available tools
+        tools_result = await mcp_pool.request(lambda session: session.list_tools(), cmd=cmd)
+        
+        # Prefix tool names with server name
+        prefixed_tools = []
+        for tool in tools_result.tools:
+            tool.name = f"{server_name}_{tool.name}"
+            prefixed_tools.append(tool)
+        
+        print(f"✅ Connected to {server_name}: {len(prefixed_tools)} tools")
+        return prefixed_tools
+        
     except Exception as e:
         print(f"❌ Failed to connect to {server_name}: {e}")
         return []
 
+def load_server_config():
+    """Parsed aws_mcp_config.json, re-read only when the file changes; None if it is missing"""
+    try:
+        mtime = os.stat(MCP_CONFIG_PATH).st_mtime
+    except OSError:
+        return None
+    if _SERVER_CONFIG["mtime"] != mtime:
+        with open(MCP_CONFIG_PATH, 'rb') as f:
+            _SERVER_CONFIG.update(mtime=mtime, servers=orjson.loads(f.read()))
+    return _SERVER_CONFIG["servers"]
+
 async def get_all_aws_mcp_tools():
     """Load all official AWS MCP servers and get their tools"""
-    all_tools = []
-    
     # Load server configuration
-    if not os.path.exists('aws_mcp_config.json'):
+    server_config = load_server_config()
+    if server_config is None:
         print("❌ AWS MCP config not found. Run setup_aws_official_mcp.py first")
         return []
     
-    with open('aws_mcp_config.json', 'r') as f:
-        server_config = json.load(f)
+    # Start every server concurrently so startup costs the slowest handshake, not the sum
+    tasks = [connect_to_aws_mcp_server(name, config['path']) for name, config in server_config.items()]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    # Connect to each server
-    for server_name, config in server_config.items():
-        tools = await connect_to_aws_mcp_server(server_name, config['path'])
-        all_tools.extend(tools)
+    for server_name, result in zip(server_config, results):
+        if isinstance(result, Exception):
+            print(f"❌ Failed to connect to {server_name}: {result}")
     
-    return all_tools
+    return [tool for result in results if isinstance(result, list) for tool in result]
 
 # Create agent
 agent = Agent(
-    model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+    model=MODEL_ID,
     system_prompt="""You're an AWS expert assistant with access to official AWS MCP tools:
 
 🔧 OFFICIAL AWS MCP TOOLS:
@@ -110,7 +116,7 @@ agent = Agent(
 
 These are the official AWS MCP servers from https://github.com/awslabs/mcp
 Use these tools to help users with comprehensive AWS operations.""",
-    hooks=[MemoryHook()] if MEMORY_ID else [],
+    hooks=[MemoryHook(memory_client, MEMORY_ID)] if MEMORY_ID else [],
     state={"session_id": "default"}
 )
 
@@ -120,19 +126,30 @@ def invoke(payload, context):
     if hasattr(context, 'session_id'):
         agent.state.set("session_id", context.session_id)
     
-    # Load tools from official AWS MCP servers
-    try:
-        aws_tools = asyncio.run(get_all_aws_mcp_tools())
-        if aws_tools:
-            agent.tools = aws_tools
-            print(f"🚀 Loaded {len(aws_tools)} official AWS MCP tools")
-        else:
-            print("⚠️ No official AWS MCP tools loaded")
-    except Exception as e:
-        print(f"❌ Error loading official AWS MCP tools: {e}")
+    # Load tools from official AWS MCP servers; server processes stay up between invocations
+    if not (_TOOLS_CACHE["tools"] and time.monotonic() - _TOOLS_CACHE["ts"] < MCP_TOOL_TTL):
+        try:
+            aws_tools = run_async(get_all_aws_mcp_tools())
+            _TOOLS_CACHE.update(ts=time.monotonic(), tools=aws_tools)
+            if aws_tools:
+                agent.tools = aws_tools
+                print(f"🚀 Loaded {len(aws_tools)} official AWS MCP tools")
+            else:
+                print("⚠️ No official AWS MCP tools loaded")
+        except Exception as e:
+            print(f"❌ Error loading official AWS MCP tools: {e}")
+    
+    prompt = payload.get("prompt", "Hello! I'm your AWS expert assistant with official AWS MCP tools.")
+    cache_key = llm_cache.key(agent, prompt)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        llm_cache.record(agent, prompt, cached)
+        return cached
     
-    response = agent(payload.get("prompt", "Hello! I'm your AWS expert assistant with official AWS MCP tools."))
-    return response.message['content'][0]['text']
+    response = agent(prompt)
+    text = response.message['content'][0]['text']
+    llm_cache.set(cache_key, agent, prompt, text)
+    return text
 
 if __name__ == "__main__":
     app.run()
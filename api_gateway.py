@@ -4,6 +4,25 @@ Lambda function to integrate AgentCore with API Gateway for frontend
 import json
 import boto3
 import os
+from botocore.config import Config
+
+# Created once per container so warm invocations skip client construction
+AGENTCORE = boto3.client(
+    'bedrock-agentcore-runtime',
+    config=Config(tcp_keepalive=True, retries={'mode': 'standard', 'total_max_attempts': 3})
+)
+AGENT_ARN = os.environ['AGENT_ARN']
+
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+ERROR_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
 
 def lambda_handler(event, context):
     """Handle API Gateway requests to AgentCore"""
@@ -13,23 +32,16 @@ def lambda_handler(event, context):
     prompt = body.get('prompt', '')
     
     # Call AgentCore Runtime
-    agentcore_client = boto3.client('bedrock-agentcore-runtime')
-    
     try:
-        response = agentcore_client.invoke_agent(
-            agentArn=os.environ['AGENT_ARN'],
+        response = AGENTCORE.invoke_agent(
+            agentArn=AGENT_ARN,
             sessionId=event.get('requestContext', {}).get('requestId', 'default'),
             inputText=prompt
         )
         
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
+            'headers': CORS_HEADERS,
             'body': json.dumps({
                 'response': response.get('output', {}).get('text', 'No response')
             })
@@ -37,10 +49,7 @@ def lambda_handler(event, context):
     except Exception as e:
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
+            'headers': ERROR_HEADERS,
             'body': json.dumps({
                 'error': str(e)
             })
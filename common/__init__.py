@@ -0,0 +1,3 @@
+"""
+Shared building blocks for the AgentCore agents and setup scripts
+"""
@@ -0,0 +1,25 @@
+"""
+Retry helper for AWS calls made right after IAM changes
+"""
+import time
+from botocore.exceptions import ClientError
+
+# IAM changes usually propagate in seconds but occasionally take over a minute
+IAM_PROPAGATION_TIMEOUT = 90
+
+# Error codes AWS returns while a new role or policy is not yet visible to the calling service
+_IAM_NOT_READY_CODES = {'AccessDenied', 'AccessDeniedException'}
+
+def retry_until_iam_ready(fn, *args, **kwargs):
+    """Call fn, retrying with backoff while IAM changes are still propagating (AccessDenied)"""
+    deadline = time.monotonic() + IAM_PROPAGATION_TIMEOUT
+    delay = 1.0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in _IAM_NOT_READY_CODES \
+                    or time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 1.6, 8.0)
@@ -0,0 +1,66 @@
+"""
+Exact-match response cache for top-level agent calls
+"""
+import os
+import json
+import hashlib
+from cachetools import LRUCache
+from strands.hooks import MessageAddedEvent
+
+# Set LLM_CACHE_MODE=exact to enable; responses are reused for LLM_CACHE_TTL seconds
+LLM_CACHE_MODE = os.getenv('LLM_CACHE_MODE', 'off')
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', os.path.expanduser('~/.agentcore_cache'))
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', '3600'))
+
+class LLMCache:
+    """Disk-backed cache of final responses keyed on model, system prompt, tools, session, session history and prompt"""
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.enabled = LLM_CACHE_MODE == 'exact'
+        self._cache = None
+        # session_id -> running digest of that session's (prompt, response) turns, advanced once per turn;
+        # the shared agent's messages mix every session and grow forever, so they are not hashed
+        self._history = LRUCache(maxsize=4096)
+        if self.enabled:
+            import diskcache  # Only needed when the cache is switched on
+            self._cache = diskcache.Cache(LLM_CACHE_DIR)
+
+    def key(self, agent, prompt: str):
+        """Hash everything that determines the response for a deterministic model"""
+        if not self.enabled:
+            return None
+        # Session and its turns are part of the key so follow-ups never get another conversation's reply
+        session_id = agent.state.get("session_id")
+        material = json.dumps({
+            "model": self.model_id,
+            "system": agent.system_prompt,
+            "tools": sorted(agent.tool_names),
+            "session": session_id,
+            "history": self._history.get(session_id, ""),
+            "prompt": prompt
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str):
+        """Return the cached response text, or None on a miss or when disabled"""
+        return self._cache.get(key) if self.enabled else None
+
+    def _advance(self, agent, prompt: str, text: str):
+        """Fold one completed turn into the session's history digest"""
+        session_id = agent.state.get("session_id")
+        turn = json.dumps([self._history.get(session_id, ""), prompt, text])
+        self._history[session_id] = hashlib.sha256(turn.encode()).hexdigest()
+
+    def record(self, agent, prompt: str, text: str):
+        """Add a cache hit to the conversation as if the agent had answered, firing the message hooks"""
+        self._advance(agent, prompt, text)
+        for message in ({"role": "user", "content": [{"text": prompt}]},
+                        {"role": "assistant", "content": [{"text": text}]}):
+            agent.messages.append(message)
+            agent.hooks.invoke_callbacks(MessageAddedEvent(agent=agent, message=message))
+
+    def set(self, key: str, agent, prompt: str, text: str):
+        """Cache the agent's response to prompt and count the turn in the session history"""
+        if self.enabled:
+            self._cache.set(key, text, expire=LLM_CACHE_TTL)
+            self._advance(agent, prompt, text)
@@ -0,0 +1,132 @@
+"""
+Long-lived MCP client sessions shared by the agents
+"""
+import os
+import atexit
+import asyncio
+import threading
+import concurrent.futures
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.shared.exceptions import McpError
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+# Seconds one MCP request may take before its session is treated as dead and replaced
+MCP_REQUEST_TIMEOUT = float(os.getenv('MCP_REQUEST_TIMEOUT', '25'))
+
+def _is_dead_session(e: BaseException) -> bool:
+    """Whether e means the pooled session is unusable rather than that the request itself failed"""
+    if isinstance(e, (asyncio.TimeoutError, anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)):
+        return True
+    # Streamable HTTP reports a restarted server (HTTP 404) as a JSON-RPC error instead of raising
+    return isinstance(e, McpError) and (e.error.code == 32600 or e.error.message == "Session terminated")
+
+class MCPSessionPool:
+    """Keeps one initialized MCP session open per server URL or stdio command"""
+    def __init__(self):
+        # key -> (future resolving to the session, event that ends its holder task)
+        self._sessions = {}
+        self._holders = set()
+
+    @staticmethod
+    def _key(url: str, headers: dict, cmd: list):
+        return tuple(cmd) if cmd else (url, frozenset((headers or {}).items()))
+
+    def _entry(self, url: str, headers: dict, cmd: list):
+        """Return the pool entry for url (or cmd over stdio), starting its holder on first use"""
+        key = self._key(url, headers, cmd)
+        if key not in self._sessions:
+            entry = (asyncio.get_running_loop().create_future(), asyncio.Event())
+            self._sessions[key] = entry
+            holder = asyncio.create_task(self._hold(key, url, headers or {}, cmd, entry))
+            self._holders.add(holder)
+            holder.add_done_callback(self._holders.discard)
+        return self._sessions[key]
+
+    async def get(self, url: str = None, headers: dict = None, cmd: list = None) -> ClientSession:
+        """Return the cached session for url (or cmd over stdio), connecting on first use"""
+        return await asyncio.shield(self._entry(url, headers, cmd)[0])
+
+    def invalidate(self, key, entry=None):
+        """Drop the session for key (only if it is still entry, when given) and close it"""
+        current = self._sessions.get(key)
+        if current is None or (entry is not None and current is not entry):
+            return
+        del self._sessions[key]
+        current[1].set()
+
+    async def request(self, op, url: str = None, headers: dict = None, cmd: list = None):
+        """Await op(session) on the pooled session; if the session is dead, replace it and retry once"""
+        key = self._key(url, headers, cmd)
+        for attempt in (1, 2):
+            entry = self._entry(url, headers, cmd)
+            try:
+                session = await asyncio.shield(entry[0])
+                return await asyncio.wait_for(op(session), MCP_REQUEST_TIMEOUT)
+            except Exception as e:
+                if attempt == 2 or not _is_dead_session(e):
+                    raise
+                self.invalidate(key, entry)
+
+    async def _hold(self, key, url: str, headers: dict, cmd: list, entry: tuple):
+        """Own the transport and session so they are entered and exited in one task"""
+        ready, stop = entry
+        if cmd:
+            transport = stdio_client(StdioServerParameters(command=cmd[0], args=list(cmd[1:])))
+        else:
+            transport = streamablehttp_client(url, headers=headers)
+        try:
+            async with transport as streams:
+                # Server messages pass through a relay that ends the holder when the server side
+                # closes (e.g. a stdio process exits), so the dead session is dropped at once
+                relay_send, relay_recv = anyio.create_memory_object_stream(0)
+                relay = asyncio.create_task(self._relay(streams[0], relay_send, stop))
+                try:
+                    async with ClientSession(relay_recv, streams[1]) as session:
+                        await asyncio.wait_for(session.initialize(), MCP_REQUEST_TIMEOUT)
+                        ready.set_result(session)
+                        await stop.wait()
+                finally:
+                    relay.cancel()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            # Drop dead connections and servers so the next get() reconnects or respawns them
+            self.invalidate(key, entry)
+
+    @staticmethod
+    async def _relay(read_stream, relay_send, stop: asyncio.Event):
+        """Forward server messages to the session, then stop the holder once the server side ends"""
+        try:
+            async with relay_send:
+                async for message in read_stream:
+                    await relay_send.send(message)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            pass
+        finally:
+            stop.set()
+
+    async def close(self):
+        """Close every pooled session and stop any stdio server processes"""
+        for key in list(self._sessions):
+            self.invalidate(key)
+        await asyncio.gather(*self._holders, return_exceptions=True)
+
+# One background event loop and session pool for the lifetime of the app
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, daemon=True).start()
+mcp_pool = MCPSessionPool()
+
+def run_async(coro, timeout: float = 60):
+    """Run a coroutine on the background loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, _LOOP)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        # Stop the coroutine too, or stuck calls keep piling up on the shared loop
+        future.cancel()
+        raise
+
+atexit.register(lambda: run_async(mcp_pool.close(), timeout=10))
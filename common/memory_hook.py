@@ -0,0 +1,109 @@
+"""
+AgentCore Memory hook shared by every agent
+"""
+import time
+import queue
+import atexit
+import threading
+from strands.hooks import AgentInitializedEvent, HookProvider, MessageAddedEvent
+
+# Most events sent in one batch by the background writer
+EVENT_BATCH = 10
+
+# Seconds the writer waits for more events before sending a partial batch
+EVENT_FLUSH_INTERVAL = 0.2
+
+# Seconds shutdown waits for queued events before giving up
+EVENT_SHUTDOWN_TIMEOUT = 5.0
+
+class MemoryHook(HookProvider):
+    """Inject recent turns into the system prompt and persist new messages"""
+    def __init__(self, memory_client, memory_id):
+        self.memory_client = memory_client
+        self.memory_id = memory_id
+        
+        # Memory events are written off the request path by a single background writer
+        self._events = queue.Queue(maxsize=1000)
+        if memory_id:
+            threading.Thread(target=self._event_writer, daemon=True).start()
+            atexit.register(self.flush)
+
+    def _write_events(self, batch):
+        """Write queued (session_id, message) pairs with one create_event per session"""
+        by_session = {}
+        for session_id, message in batch:
+            by_session.setdefault(session_id, []).append(message)
+        for session_id, messages in by_session.items():
+            try:
+                self.memory_client.create_event(
+                    memory_id=self.memory_id,
+                    actor_id="user",
+                    session_id=session_id,
+                    messages=messages
+                )
+            except Exception as e:
+                print(f"Error writing memory events: {e}")
+
+    def _event_writer(self):
+        """Drain up to EVENT_BATCH events, waiting at most EVENT_FLUSH_INTERVAL to fill a batch"""
+        while True:
+            batch = [self._events.get()]
+            deadline = time.monotonic() + EVENT_FLUSH_INTERVAL
+            while len(batch) < EVENT_BATCH:
+                try:
+                    batch.append(self._events.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._write_events(batch)
+            for _ in batch:
+                self._events.task_done()
+
+    def flush(self, timeout: float = EVENT_SHUTDOWN_TIMEOUT):
+        """Wait until queued events are written, or timeout seconds pass"""
+        deadline = time.monotonic() + timeout
+        with self._events.all_tasks_done:
+            while self._events.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"⚠️ {self._events.unfinished_tasks} memory events not written before shutdown")
+                    return
+                self._events.all_tasks_done.wait(remaining)
+
+    def on_agent_initialized(self, event):
+        session_id = event.agent.state.get("session_id", "default")
+        turns = self.memory_client.get_last_k_turns(
+            memory_id=self.memory_id,
+            actor_id="user",
+            session_id=session_id,
+            k=3
+        )
+        suffix = ""
+        if turns:
+            # Collect the pieces and join once rather than formatting a string per message
+            parts = ["\n\nPrevious:\n"]
+            append = parts.append
+            for t in turns:
+                for m in t:
+                    append(m['role'])
+                    append(": ")
+                    append(m['content']['text'])
+                    append("\n")
+            if len(parts) > 1:
+                parts.pop()  # No newline after the last message
+            suffix = "".join(parts)
+        event.agent.system_prompt = "".join((event.agent.system_prompt, suffix))
+
+    def on_message_added(self, event):
+        msg = event.agent.messages[-1]
+        item = (event.agent.state.get("session_id", "default"), (str(msg["content"]), msg["role"]))
+        try:
+            self._events.put_nowait(item)
+        except queue.Full:
+            self._write_events([item])  # Writer is backed up; fall back to a direct write
+
+    def register_hooks(self, registry):
+        # Without a memory resource the callbacks are never registered, so they need no guard
+        if not self.memory_id:
+            return
+        registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
+        registry.add_callback(MessageAddedEvent, self.on_message_added)
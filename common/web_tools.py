@@ -0,0 +1,85 @@
+"""
+Cached HTTP fetching and web search shared by the agents' internet tools
+"""
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from cachetools import TTLCache
+
+# Shared HTTP session so repeat requests to the same host reuse keep-alive connections
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+_HTTP.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+_HTTP.headers["User-Agent"] = "agentcore-agent/1.0"
+FETCH_READ_BYTES = 4096
+
+# Worker threads for fetch_many; they share the session's connection pool
+_FETCH_POOL = ThreadPoolExecutor(max_workers=16)
+
+# Bounded TTL cache for web tool results, keyed by tool name and argument
+_RESPONSE_CACHE = TTLCache(maxsize=1024, ttl=600)
+_RESPONSE_CACHE_LOCK = threading.Lock()
+_RESPONSE_CACHE_STATS = {"hits": 0, "misses": 0}
+
+def _cache_key(tool_name: str, arg: str) -> str:
+    return hashlib.sha256(f"{tool_name}\x00{arg}".encode()).hexdigest()
+
+def _cache_get(key: str):
+    """Return the cached result for key, or None on a miss"""
+    with _RESPONSE_CACHE_LOCK:
+        value = _RESPONSE_CACHE.get(key)
+        _RESPONSE_CACHE_STATS["hits" if value is not None else "misses"] += 1
+        return value
+
+def _cache_set(key: str, value: str):
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = value
+
+def _is_cacheable(url: str, response) -> bool:
+    """Skip one-shot URLs and responses the server marked as uncacheable"""
+    if 'nonce=' in url:
+        return False
+    return 'no-store' not in response.headers.get('Cache-Control', '')
+
+def fetch(url: str) -> str:
+    """Fetch the start of a URL through the shared session and response cache"""
+    key = _cache_key("fetch_url_data", url)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    try:
+        # Stream the body and stop after 4 KB rather than downloading the whole page
+        with _HTTP.get(url, timeout=10, stream=True) as response:
+            body = response.raw.read(FETCH_READ_BYTES, decode_content=True)
+            text = body.decode(response.encoding or "utf-8", errors="replace")[:1000]
+        if response.ok and _is_cacheable(url, response):
+            _cache_set(key, text)
+        return text
+    except Exception as e:
+        return f"Error fetching {url}: {str(e)}"
+
+def fetch_many(urls: list) -> str:
+    """Fetch several URLs concurrently; returns a JSON object of url -> content"""
+    results = list(_FETCH_POOL.map(fetch, urls))
+    return orjson.dumps(dict(zip(urls, results))).decode()
+
+def search(query: str) -> str:
+    """Search the web with the DuckDuckGo Instant Answer API through the response cache"""
+    key = _cache_key("search_web", query)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    try:
+        url = f"https://api.duckduckgo.com/?q={query}&format=json&no_html=1"
+        response = _HTTP.get(url, timeout=10)
+        data = response.json()
+        result = data.get('AbstractText', 'No results found')[:500]
+        # Transient errors (429/5xx) would otherwise be served for the whole TTL
+        if response.ok and _is_cacheable(url, response):
+            _cache_set(key, result)
+        return result
+    except Exception as e:
+        return f"Search error: {str(e)}"
@@ -25,7 +25,7 @@ mkdir -p mcp-servers/aws-diagram
 cat > mcp-servers/aws-diagram/Dockerfile << 'EOF'
 FROM python:3.9-slim
 WORKDIR /app
-RUN pip install bedrock-agentcore diagrams
+RUN pip install bedrock-agentcore diagrams orjson
 COPY server.py .
 EXPOSE 8000
 CMD ["python", "server.py"]
@@ -36,12 +36,7 @@ mkdir -p mcp-servers/aws-eks
 cat > mcp-servers/aws-eks/Dockerfile << 'EOF'
 FROM python:3.9-slim
 WORKDIR /app
-RUN apt-get update && apt-get install -y curl && \
-    curl -LO "https://dl.k8s.io/release/$(curl -L -s https://dl.k8s.io/release/stable.txt)/bin/linux/amd64/kubectl" && \
-    install -o root -g root -m 0755 kubectl /usr/local/bin/kubectl && \
-    curl "https://awscli.amazonaws.com/awscli-exe-linux-x86_64.zip" -o "awscliv2.zip" && \
-    unzip awscliv2.zip && ./aws/install && rm -rf aws awscliv2.zip
-RUN pip install bedrock-agentcore boto3
+RUN pip install bedrock-agentcore boto3 kubernetes orjson
 COPY server.py .
 EXPOSE 8000
 CMD ["python", "server.py"]
@@ -68,7 +63,7 @@ mkdir -p mcp-servers/aws-cost
 cat > mcp-servers/aws-cost/Dockerfile << 'EOF'
 FROM python:3.9-slim
 WORKDIR /app
-RUN pip install bedrock-agentcore boto3
+RUN pip install bedrock-agentcore boto3 cachetools orjson numpy
 COPY server.py .
 EXPOSE 8000
 CMD ["python", "server.py"]
@@ -79,7 +74,7 @@ mkdir -p mcp-servers/github
 cat > mcp-servers/github/Dockerfile << 'EOF'
 FROM python:3.9-slim
 WORKDIR /app
-RUN pip install bedrock-agentcore requests
+RUN pip install bedrock-agentcore 'httpx[http2]' 'hishel<1.0' uvloop orjson
 COPY server.py .
 EXPOSE 8000
 CMD ["python", "server.py"]
@@ -90,6 +85,7 @@ cat > Dockerfile.aws-agent << 'EOF'
 FROM python:3.9-slim
 WORKDIR /app
 RUN pip install bedrock-agentcore strands-agents mcp requests
+COPY common/ common/
 COPY agent_with_aws_mcp.py .
 EXPOSE 8080
 CMD ["python", "agent_with_aws_mcp.py"]
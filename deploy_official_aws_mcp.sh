@@ -64,8 +64,9 @@ cat > Dockerfile.official-aws-agent << 'EOF'
 FROM python:3.9-slim
 WORKDIR /app
 
-RUN pip install bedrock-agentcore strands-agents mcp boto3
+RUN pip install bedrock-agentcore strands-agents mcp boto3 orjson
 
+COPY common/ common/
 COPY agent_with_official_aws_mcp.py .
 COPY aws_mcp_config.json .
 
@@ -3,21 +3,81 @@ AWS Cost MCP Server - Cost analysis and optimization
 """
 from bedrock_agentcore.mcp import MCPServer
 import boto3
-import json
+import orjson
+import numpy as np
+import functools
+import threading
 from datetime import datetime, timedelta
+from botocore.config import Config
+from cachetools import TTLCache
+from cachetools.keys import hashkey
 
 server = MCPServer()
 
+# One session for the process; clients derived from it share credentials and retry settings
+SESSION = boto3.session.Session()
+_BOTO_CONFIG = Config(max_pool_connections=32, retries={'mode': 'adaptive'})
+_SESSION_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=32)
+def _client(service: str, region: str = 'us-east-1'):
+    """Build a boto3 client once per service and region and reuse it across tool calls"""
+    # Sessions are not thread-safe, so serialize client construction
+    with _SESSION_LOCK:
+        return SESSION.client(service, region_name=region, config=_BOTO_CONFIG)
+
+@functools.lru_cache(maxsize=1)
+def _account_id() -> str:
+    """Look up the caller's account ID once; it cannot change for the life of the process"""
+    return _client('sts').get_caller_identity()['Account']
+
+# Cost Explorer is slow and billed per request; aggregates move slowly and recommendations daily
+_COST_CACHE = TTLCache(maxsize=128, ttl=900)
+_RECOMMENDATION_CACHE = TTLCache(maxsize=32, ttl=3600)
+_CACHE_LOCK = threading.Lock()
+
+def _cached(cache: TTLCache):
+    """Reuse a tool's successful results from cache, keyed on its name and arguments"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = hashkey(func.__name__, *args, **kwargs)
+            with _CACHE_LOCK:
+                if key in cache:
+                    return cache[key]
+            result = func(*args, **kwargs)
+            # Errors are returned as strings, so keep them out of the cache
+            if not result.startswith("Error"):
+                with _CACHE_LOCK:
+                    cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
+# Cap on services returned by get_cost_by_service, largest spend first
+TOP_SERVICES = 50
+
+def _cost_and_usage(ce, **kwargs):
+    """Yield every ResultsByTime entry, following NextPageToken across pages"""
+    while True:
+        response = ce.get_cost_and_usage(**kwargs)
+        yield from response['ResultsByTime']
+        if not response.get('NextPageToken'):
+            return
+        kwargs['NextPageToken'] = response['NextPageToken']
+
 @server.tool()
+@_cached(_COST_CACHE)
 def get_monthly_costs(months: int = 3) -> str:
     """Get monthly costs for the last N months"""
     try:
-        ce = boto3.client('ce', region_name='us-east-1')
+        ce = _client('ce')
         
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=months * 30)
         
-        response = ce.get_cost_and_usage(
+        results = _cost_and_usage(
+            ce,
             TimePeriod={
                 'Start': start_date.strftime('%Y-%m-%d'),
                 'End': end_date.strftime('%Y-%m-%d')
@@ -28,7 +88,7 @@ def get_monthly_costs(months: int = 3) -> str:
         )
         
         costs = []
-        for result in response['ResultsByTime']:
+        for result in results:
             period = result['TimePeriod']
             for group in result['Groups']:
                 service = group['Keys'][0]
@@ -40,20 +100,22 @@ def get_monthly_costs(months: int = 3) -> str:
                         'cost': round(amount, 2)
                     })
         
-        return json.dumps(costs, indent=2)
+        return orjson.dumps(costs).decode()
     except Exception as e:
         return f"Error getting monthly costs: {str(e)}"
 
 @server.tool()
+@_cached(_COST_CACHE)
 def get_cost_by_service(days: int = 30) -> str:
     """Get costs broken down by AWS service"""
     try:
-        ce = boto3.client('ce', region_name='us-east-1')
+        ce = _client('ce')
         
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
         
-        response = ce.get_cost_and_usage(
+        results = _cost_and_usage(
+            ce,
             TimePeriod={
                 'Start': start_date.strftime('%Y-%m-%d'),
                 'End': end_date.strftime('%Y-%m-%d')
@@ -63,25 +125,35 @@ def get_cost_by_service(days: int = 30) -> str:
             GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
         )
         
-        service_costs = {}
-        for result in response['ResultsByTime']:
+        # Collect raw amount strings per service index; numpy parses and sums them in one pass
+        service_index = {}
+        indices = []
+        amounts = []
+        for result in results:
             for group in result['Groups']:
-                service = group['Keys'][0]
-                amount = float(group['Metrics']['BlendedCost']['Amount'])
-                service_costs[service] = service_costs.get(service, 0) + amount
+                indices.append(service_index.setdefault(group['Keys'][0], len(service_index)))
+                amounts.append(group['Metrics']['BlendedCost']['Amount'])
+        
+        totals = np.bincount(np.asarray(indices, dtype=np.intp),
+                             weights=np.asarray(amounts, dtype=np.float64),
+                             minlength=len(service_index))
         
-        # Sort by cost descending
-        sorted_costs = sorted(service_costs.items(), key=lambda x: x[1], reverse=True)
+        # Top services by cost, descending; ties keep first-seen order
+        services = list(service_index)
+        top = np.argsort(-totals, kind='stable')[:TOP_SERVICES]
+        rounded = np.round(totals, 2).tolist()
         
-        return json.dumps([{'service': k, 'total_cost': round(v, 2)} for k, v in sorted_costs if v > 0], indent=2)
+        return orjson.dumps([{'service': services[i], 'total_cost': rounded[i]}
+                             for i in top.tolist() if totals[i] > 0]).decode()
     except Exception as e:
         return f"Error getting costs by service: {str(e)}"
 
 @server.tool()
+@_cached(_RECOMMENDATION_CACHE)
 def get_rightsizing_recommendations() -> str:
     """Get EC2 rightsizing recommendations"""
     try:
-        ce = boto3.client('ce', region_name='us-east-1')
+        ce = _client('ce')
         
         response = ce.get_rightsizing_recommendation(
             Service='AmazonEC2',
@@ -101,15 +173,16 @@ def get_rightsizing_recommendations() -> str:
                 'cpu_utilization': rec.get('CurrentInstance', {}).get('ResourceUtilization', {}).get('EC2ResourceUtilization', {}).get('MaxCpuUtilizationPercentage', 'Unknown')
             })
         
-        return json.dumps(recommendations, indent=2)
+        return orjson.dumps(recommendations).decode()
     except Exception as e:
         return f"Error getting rightsizing recommendations: {str(e)}"
 
 @server.tool()
+@_cached(_RECOMMENDATION_CACHE)
 def get_savings_plans_recommendations() -> str:
     """Get Savings Plans purchase recommendations"""
     try:
-        ce = boto3.client('ce', region_name='us-east-1')
+        ce = _client('ce')
         
         response = ce.get_savings_plans_purchase_recommendation(
             SavingsPlansType='COMPUTE_SP',
@@ -128,15 +201,16 @@ def get_savings_plans_recommendations() -> str:
                 'estimated_roi': rec.get('EstimatedROI', 'Unknown')
             })
         
-        return json.dumps(recommendations, indent=2)
+        return orjson.dumps(recommendations).decode()
     except Exception as e:
         return f"Error getting Savings Plans recommendations: {str(e)}"
 
 @server.tool()
+@_cached(_COST_CACHE)
 def analyze_cost_anomalies(days: int = 7) -> str:
     """Detect cost anomalies in the last N days"""
     try:
-        ce = boto3.client('ce', region_name='us-east-1')
+        ce = _client('ce')
         
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
@@ -159,7 +233,7 @@ def analyze_cost_anomalies(days: int = 7) -> str:
                 'feedback': anomaly.get('Feedback', 'NONE')
             })
         
-        return json.dumps(anomalies, indent=2)
+        return orjson.dumps(anomalies).decode()
     except Exception as e:
         return f"Error analyzing cost anomalies: {str(e)}"
 
@@ -167,8 +241,8 @@ def analyze_cost_anomalies(days: int = 7) -> str:
 def get_budget_status() -> str:
     """Get current budget status and alerts"""
     try:
-        budgets = boto3.client('budgets')
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        budgets = _client('budgets')
+        account_id = _account_id()
         
         response = budgets.describe_budgets(AccountId=account_id)
         
@@ -183,7 +257,7 @@ def get_budget_status() -> str:
                 'calculated_spend': budget.get('CalculatedSpend', {})
             })
         
-        return json.dumps(budget_status, indent=2)
+        return orjson.dumps(budget_status).decode()
     except Exception as e:
         return f"Error getting budget status: {str(e)}"
 
@@ -8,56 +8,85 @@ from diagrams.aws.storage import S3
 from diagrams.aws.network import APIGateway, CloudFront
 from diagrams.aws.database import RDS, Dynamodb
 from diagrams.aws.security import IAM, Cognito
-import json
+import orjson
 import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
 server = MCPServer()
 
+# Component type accepted in create_aws_diagram -> diagrams node class
+_COMPONENT_CLASSES = {
+    'lambda': Lambda,
+    'ec2': EC2,
+    's3': S3,
+    'apigateway': APIGateway,
+    'cloudfront': CloudFront,
+    'rds': RDS,
+    'dynamodb': Dynamodb,
+    'iam': IAM,
+    'cognito': Cognito
+}
+
+# Graphviz rendering is CPU-bound, so it runs in worker processes off the request path
+EXEC = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# PNG path -> inputs it was last rendered from, so repeat requests skip Graphviz entirely;
+# keyed by path because different inputs (e.g. the same title) can share an output file
+_RENDERED = {}
+_RENDERED_MAX = 128
+
+# One lock per output path so two renders never write the same file at once
+_RENDER_LOCKS = {}
+
+async def _render_cached(path: str, inputs: tuple, render, *args) -> str:
+    """Render in the worker pool unless path already holds the diagram for these inputs"""
+    async with _RENDER_LOCKS.setdefault(path, asyncio.Lock()):
+        if _RENDERED.get(path) == inputs and os.path.exists(path):
+            return path
+        # Forget the old inputs first so a failed render never leaves a stale entry behind
+        _RENDERED.pop(path, None)
+        path = await asyncio.get_running_loop().run_in_executor(EXEC, render, *args)
+        if len(_RENDERED) >= _RENDERED_MAX:
+            del _RENDERED[next(iter(_RENDERED))]
+        _RENDERED[path] = inputs
+        return path
+
+def _render_diagram(title: str, components_list: list, filename: str) -> str:
+    """Draw a diagram from a component list; runs in a worker process"""
+    with Diagram(title, show=False, filename=filename, direction="TB"):
+        aws_components = {}
+        
+        for comp in components_list:
+            comp_type = comp.get('type', '').lower()
+            comp_name = comp.get('name', 'Component')
+            
+            cls = _COMPONENT_CLASSES.get(comp_type)
+            if cls:
+                aws_components[comp_name] = cls(comp_name)
+        
+        # Create connections if specified
+        for comp in components_list:
+            if 'connects_to' in comp:
+                source = aws_components.get(comp['name'])
+                for target_name in comp['connects_to']:
+                    target = aws_components.get(target_name)
+                    if source and target:
+                        source >> target
+    
+    return f"{filename}.png"
+
 @server.tool()
-def create_aws_diagram(title: str, components: str, filename: str = None) -> str:
+async def create_aws_diagram(title: str, components: str, filename: str = None) -> str:
     """Create AWS architecture diagram from component list"""
     try:
         if not filename:
             filename = title.lower().replace(' ', '_')
         
-        components_list = json.loads(components)
-        
-        with Diagram(title, show=False, filename=filename, direction="TB"):
-            aws_components = {}
-            
-            for comp in components_list:
-                comp_type = comp.get('type', '').lower()
-                comp_name = comp.get('name', 'Component')
-                
-                if comp_type == 'lambda':
-                    aws_components[comp_name] = Lambda(comp_name)
-                elif comp_type == 'ec2':
-                    aws_components[comp_name] = EC2(comp_name)
-                elif comp_type == 's3':
-                    aws_components[comp_name] = S3(comp_name)
-                elif comp_type == 'apigateway':
-                    aws_components[comp_name] = APIGateway(comp_name)
-                elif comp_type == 'cloudfront':
-                    aws_components[comp_name] = CloudFront(comp_name)
-                elif comp_type == 'rds':
-                    aws_components[comp_name] = RDS(comp_name)
-                elif comp_type == 'dynamodb':
-                    aws_components[comp_name] = Dynamodb(comp_name)
-                elif comp_type == 'iam':
-                    aws_components[comp_name] = IAM(comp_name)
-                elif comp_type == 'cognito':
-                    aws_components[comp_name] = Cognito(comp_name)
-            
-            # Create connections if specified
-            for comp in components_list:
-                if 'connects_to' in comp:
-                    source = aws_components.get(comp['name'])
-                    for target_name in comp['connects_to']:
-                        target = aws_components.get(target_name)
-                        if source and target:
-                            source >> target
+        components_list = orjson.loads(components)
         
-        return f"Diagram created: {filename}.png"
+        path = await _render_cached(f"{filename}.png", (title, components), _render_diagram, title, components_list, filename)
+        return f"Diagram created: {path}"
     except Exception as e:
         return f"Error creating diagram: {str(e)}"
 
@@ -73,37 +102,42 @@ def list_aws_services() -> str:
         "analytics": ["athena", "glue", "kinesis"],
         "ml": ["bedrock", "sagemaker", "comprehend"]
     }
-    return json.dumps(services, indent=2)
+    return orjson.dumps(services).decode()
+
+def _render_serverless(app_name: str) -> str:
+    """Draw the standard serverless architecture; runs in a worker process"""
+    with Diagram(f"{app_name} Serverless Architecture", show=False, filename=f"{app_name}_serverless"):
+        user = EC2("User")
+        
+        with Cluster("Frontend"):
+            s3 = S3("Static Website")
+            cdn = CloudFront("CDN")
+        
+        with Cluster("API Layer"):
+            api = APIGateway("API Gateway")
+            lambda_fn = Lambda("Lambda Function")
+        
+        with Cluster("Data Layer"):
+            db = Dynamodb("DynamoDB")
+        
+        with Cluster("Security"):
+            auth = Cognito("Authentication")
+            iam = IAM("IAM Roles")
+        
+        # Connections
+        user >> s3 >> cdn
+        user >> api >> lambda_fn >> db
+        api >> auth
+        lambda_fn >> iam
+    
+    return f"{app_name}_serverless.png"
 
 @server.tool()
-def create_serverless_diagram(app_name: str) -> str:
+async def create_serverless_diagram(app_name: str) -> str:
     """Create a standard serverless architecture diagram"""
     try:
-        with Diagram(f"{app_name} Serverless Architecture", show=False, filename=f"{app_name}_serverless"):
-            user = EC2("User")
-            
-            with Cluster("Frontend"):
-                s3 = S3("Static Website")
-                cdn = CloudFront("CDN")
-            
-            with Cluster("API Layer"):
-                api = APIGateway("API Gateway")
-                lambda_fn = Lambda("Lambda Function")
-            
-            with Cluster("Data Layer"):
-                db = Dynamodb("DynamoDB")
-            
-            with Cluster("Security"):
-                auth = Cognito("Authentication")
-                iam = IAM("IAM Roles")
-            
-            # Connections
-            user >> s3 >> cdn
-            user >> api >> lambda_fn >> db
-            api >> auth
-            lambda_fn >> iam
-        
-        return f"Serverless diagram created: {app_name}_serverless.png"
+        path = await _render_cached(f"{app_name}_serverless.png", ("serverless", app_name), _render_serverless, app_name)
+        return f"Serverless diagram created: {path}"
     except Exception as e:
         return f"Error creating serverless diagram: {str(e)}"
 
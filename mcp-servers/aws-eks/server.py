@@ -4,20 +4,119 @@ AWS EKS MCP Server - Manage EKS clusters and operations
 from bedrock_agentcore.mcp import MCPServer
 import boto3
 import json
-import subprocess
+import orjson
+import time
+import base64
+import hashlib
+import os
+import tempfile
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.signers import RequestSigner
+from kubernetes import client as k8s
 
 server = MCPServer()
 
+# Shared pool for fanning out describe calls; boto3 clients are safe to share across threads
+_DESCRIBE_POOL = ThreadPoolExecutor(max_workers=16)
+
+# One session for the process; clients derived from it share credentials and retry settings
+SESSION = boto3.session.Session()
+_BOTO_CONFIG = Config(max_pool_connections=32, retries={'mode': 'adaptive'})
+_SESSION_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=32)
+def _client(service: str, region: str = 'us-west-2'):
+    """Build a boto3 client once per service and region and reuse it across tool calls"""
+    # Sessions are not thread-safe, so serialize client construction
+    with _SESSION_LOCK:
+        return SESSION.client(service, region_name=region, config=_BOTO_CONFIG)
+
+# EKS bearer tokens are valid for 15 minutes; rebuild the API client well before that
+K8S_TOKEN_TTL = 600
+_K8S_APIS = {}
+_K8S_LOCK = threading.Lock()
+
+# Cluster CA bundles, one stable file per cluster ARN so client rebuilds do not leave files behind
+_CA_DIR = os.path.join(tempfile.gettempdir(), 'eks-ca')
+
+def _eks_token(cluster_name: str, region: str) -> str:
+    """Presign an STS GetCallerIdentity call as an EKS bearer token, without the AWS CLI"""
+    sts = _client('sts', region)
+    signer = RequestSigner(sts.meta.service_model.service_id, region, 'sts', 'v4',
+                           SESSION.get_credentials(), SESSION.events)
+    url = signer.generate_presigned_url({
+        'method': 'GET',
+        'url': f"https://sts.{region}.amazonaws.com/?Action=GetCallerIdentity&Version=2011-06-15",
+        'body': {},
+        'headers': {'x-k8s-aws-id': cluster_name},
+        'context': {}
+    }, region_name=region, expires_in=60, operation_name='')
+    return 'k8s-aws-v1.' + base64.urlsafe_b64encode(url.encode()).decode().rstrip('=')
+
+def _write_ca(cluster_arn: str, ca: bytes) -> str:
+    """Write a cluster CA to its stable path, replacing it atomically only when it changed"""
+    path = os.path.join(_CA_DIR, hashlib.sha256(cluster_arn.encode()).hexdigest()[:16] + '.crt')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == ca:
+                return path
+    except FileNotFoundError:
+        pass
+    os.makedirs(_CA_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=_CA_DIR, suffix='.tmp', delete=False) as tmp:
+        tmp.write(ca)
+    os.replace(tmp.name, path)
+    return path
+
+def _core_api(cluster_name: str, region: str) -> k8s.CoreV1Api:
+    """Return a cached in-process Kubernetes API client for an EKS cluster"""
+    key = (cluster_name, region)
+    with _K8S_LOCK:
+        cached = _K8S_APIS.get(key)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+    
+    cluster = _client('eks', region).describe_cluster(name=cluster_name)['cluster']
+    configuration = k8s.Configuration()
+    configuration.host = cluster['endpoint']
+    configuration.ssl_ca_cert = _write_ca(cluster['arn'], base64.b64decode(cluster['certificateAuthority']['data']))
+    configuration.api_key['authorization'] = 'Bearer ' + _eks_token(cluster_name, region)
+    api = k8s.CoreV1Api(k8s.ApiClient(configuration))
+    
+    with _K8S_LOCK:
+        _K8S_APIS[key] = (time.monotonic() + K8S_TOKEN_TTL, api)
+    return api
+
+# (response key, output key) pairs kept from describe_cluster / describe_nodegroup
+_CLUSTER_FIELDS = (
+    ('name', 'name'), ('status', 'status'), ('version', 'version'), ('endpoint', 'endpoint'),
+    ('platformVersion', 'platform_version'), ('roleArn', 'role_arn'),
+    ('resourcesVpcConfig', 'vpc_config'), ('logging', 'logging'), ('createdAt', 'created_at')
+)
+_NODEGROUP_FIELDS = (
+    ('nodegroupName', 'name'), ('status', 'status'), ('instanceTypes', 'instance_types'),
+    ('scalingConfig', 'scaling_config'), ('health', 'health')
+)
+
+def _project(item: dict, fields: tuple) -> dict:
+    """Keep only the listed keys of a boto3 response item, under their output names"""
+    return {out: item[key] for key, out in fields if key in item}
+
 @server.tool()
 def list_eks_clusters(region: str = "us-west-2") -> str:
     """List all EKS clusters in a region"""
     try:
-        eks = boto3.client('eks', region_name=region)
+        eks = _client('eks', region)
         response = eks.list_clusters()
         
+        # Describe every cluster concurrently instead of one round-trip at a time
+        infos = _DESCRIBE_POOL.map(lambda name: eks.describe_cluster(name=name), response['clusters'])
+        
         clusters = []
-        for cluster_name in response['clusters']:
-            cluster_info = eks.describe_cluster(name=cluster_name)
+        for cluster_name, cluster_info in zip(response['clusters'], infos):
             clusters.append({
                 'name': cluster_name,
                 'status': cluster_info['cluster']['status'],
@@ -25,7 +124,7 @@ def list_eks_clusters(region: str = "us-west-2") -> str:
                 'endpoint': cluster_info['cluster']['endpoint']
             })
         
-        return json.dumps(clusters, indent=2)
+        return orjson.dumps(clusters).decode()
     except Exception as e:
         return f"Error listing EKS clusters: {str(e)}"
 
@@ -33,23 +132,12 @@ def list_eks_clusters(region: str = "us-west-2") -> str:
 def get_cluster_info(cluster_name: str, region: str = "us-west-2") -> str:
     """Get detailed information about an EKS cluster"""
     try:
-        eks = boto3.client('eks', region_name=region)
+        eks = _client('eks', region)
         response = eks.describe_cluster(name=cluster_name)
         cluster = response['cluster']
         
-        info = {
-            'name': cluster['name'],
-            'status': cluster['status'],
-            'version': cluster['version'],
-            'endpoint': cluster['endpoint'],
-            'platform_version': cluster['platformVersion'],
-            'role_arn': cluster['roleArn'],
-            'vpc_config': cluster['resourcesVpcConfig'],
-            'logging': cluster.get('logging', {}),
-            'created_at': cluster['createdAt'].isoformat()
-        }
-        
-        return json.dumps(info, indent=2, default=str)
+        # orjson writes createdAt as ISO 8601 itself, so the response values pass straight through
+        return orjson.dumps(_project(cluster, _CLUSTER_FIELDS), default=str).decode()
     except Exception as e:
         return f"Error getting cluster info: {str(e)}"
 
@@ -57,49 +145,39 @@ def get_cluster_info(cluster_name: str, region: str = "us-west-2") -> str:
 def list_nodegroups(cluster_name: str, region: str = "us-west-2") -> str:
     """List node groups for an EKS cluster"""
     try:
-        eks = boto3.client('eks', region_name=region)
+        eks = _client('eks', region)
         response = eks.list_nodegroups(clusterName=cluster_name)
         
-        nodegroups = []
-        for ng_name in response['nodegroups']:
-            ng_info = eks.describe_nodegroup(clusterName=cluster_name, nodegroupName=ng_name)
-            nodegroups.append({
-                'name': ng_name,
-                'status': ng_info['nodegroup']['status'],
-                'instance_types': ng_info['nodegroup']['instanceTypes'],
-                'scaling_config': ng_info['nodegroup']['scalingConfig'],
-                'health': ng_info['nodegroup']['health']
-            })
+        # Describe every node group concurrently instead of one round-trip at a time
+        infos = _DESCRIBE_POOL.map(
+            lambda name: eks.describe_nodegroup(clusterName=cluster_name, nodegroupName=name),
+            response['nodegroups']
+        )
+        
+        nodegroups = [_project(ng_info['nodegroup'], _NODEGROUP_FIELDS) for ng_info in infos]
         
-        return json.dumps(nodegroups, indent=2)
+        return orjson.dumps(nodegroups).decode()
     except Exception as e:
         return f"Error listing node groups: {str(e)}"
 
 @server.tool()
-def get_cluster_pods(cluster_name: str, namespace: str = "default") -> str:
-    """Get pods in an EKS cluster (requires kubectl access)"""
+def get_cluster_pods(cluster_name: str, namespace: str = "default", region: str = "us-west-2") -> str:
+    """Get pods in an EKS cluster (requires Kubernetes RBAC access)"""
     try:
-        # Update kubeconfig
-        subprocess.run(['aws', 'eks', 'update-kubeconfig', '--name', cluster_name], 
-                      capture_output=True, check=True)
-        
-        # Get pods
-        result = subprocess.run(['kubectl', 'get', 'pods', '-n', namespace, '-o', 'json'], 
-                               capture_output=True, text=True, check=True)
-        
-        pods_data = json.loads(result.stdout)
+        v1 = _core_api(cluster_name, region)
+        pods_data = v1.list_namespaced_pod(namespace)
         pods = []
         
-        for pod in pods_data['items']:
+        for pod in pods_data.items:
             pods.append({
-                'name': pod['metadata']['name'],
-                'namespace': pod['metadata']['namespace'],
-                'status': pod['status']['phase'],
-                'node': pod['spec'].get('nodeName', 'Unknown'),
-                'created': pod['metadata']['creationTimestamp']
+                'name': pod.metadata.name,
+                'namespace': pod.metadata.namespace,
+                'status': pod.status.phase,
+                'node': pod.spec.node_name or 'Unknown',
+                'created': pod.metadata.creation_timestamp.isoformat()
             })
         
-        return json.dumps(pods, indent=2)
+        return orjson.dumps(pods).decode()
     except Exception as e:
         return f"Error getting pods: {str(e)}"
 
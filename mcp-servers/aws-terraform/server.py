@@ -3,196 +3,235 @@ AWS Terraform MCP Server - Generate and manage Terraform configurations
 """
 from bedrock_agentcore.mcp import MCPServer
 import json
-import subprocess
 import os
+import asyncio
+from string import Template
 
 server = MCPServer()
 
-@server.tool()
-def generate_terraform_s3(bucket_name: str, versioning: bool = True) -> str:
-    """Generate Terraform configuration for S3 bucket"""
-    config = f'''resource "aws_s3_bucket" "{bucket_name.replace('-', '_')}" {{
-  bucket = "{bucket_name}"
-}}
-
-resource "aws_s3_bucket_versioning" "{bucket_name.replace('-', '_')}_versioning" {{
-  bucket = aws_s3_bucket.{bucket_name.replace('-', '_')}.id
-  versioning_configuration {{
-    status = "{'Enabled' if versioning else 'Disabled'}"
-  }}
-}}
-
-resource "aws_s3_bucket_server_side_encryption_configuration" "{bucket_name.replace('-', '_')}_encryption" {{
-  bucket = aws_s3_bucket.{bucket_name.replace('-', '_')}.id
-
-  rule {{
-    apply_server_side_encryption_by_default {{
+# Terraform bodies are parsed once at import; each tool call is a single substitute()
+_S3_TMPL = Template('''resource "aws_s3_bucket" "${name}" {
+  bucket = "${bucket}"
+}
+
+resource "aws_s3_bucket_versioning" "${name}_versioning" {
+  bucket = aws_s3_bucket.${name}.id
+  versioning_configuration {
+    status = "${status}"
+  }
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "${name}_encryption" {
+  bucket = aws_s3_bucket.${name}.id
+
+  rule {
+    apply_server_side_encryption_by_default {
       sse_algorithm = "AES256"
-    }}
-  }}
-}}'''
-    return config
+    }
+  }
+}''')
 
-@server.tool()
-def generate_terraform_lambda(function_name: str, runtime: str = "python3.9") -> str:
-    """Generate Terraform configuration for Lambda function"""
-    config = f'''resource "aws_iam_role" "{function_name}_role" {{
-  name = "{function_name}-role"
+_LAMBDA_TMPL = Template('''resource "aws_iam_role" "${name}_role" {
+  name = "${name}-role"
 
-  assume_role_policy = jsonencode({{
+  assume_role_policy = jsonencode({
     Version = "2012-10-17"
     Statement = [
-      {{
+      {
         Action = "sts:AssumeRole"
         Effect = "Allow"
-        Principal = {{
+        Principal = {
           Service = "lambda.amazonaws.com"
-        }}
-      }}
+        }
+      }
     ]
-  }})
-}}
+  })
+}
 
-resource "aws_iam_role_policy_attachment" "{function_name}_basic" {{
+resource "aws_iam_role_policy_attachment" "${name}_basic" {
   policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
-  role       = aws_iam_role.{function_name}_role.name
-}}
+  role       = aws_iam_role.${name}_role.name
+}
 
-resource "aws_lambda_function" "{function_name}" {{
-  filename         = "{function_name}.zip"
-  function_name    = "{function_name}"
-  role            = aws_iam_role.{function_name}_role.arn
+resource "aws_lambda_function" "${name}" {
+  filename         = "${name}.zip"
+  function_name    = "${name}"
+  role            = aws_iam_role.${name}_role.arn
   handler         = "index.handler"
-  runtime         = "{runtime}"
+  runtime         = "${runtime}"
   timeout         = 30
 
-  source_code_hash = filebase64sha256("{function_name}.zip")
-}}'''
-    return config
+  source_code_hash = filebase64sha256("${name}.zip")
+}''')
 
-@server.tool()
-def generate_terraform_vpc(vpc_name: str, cidr_block: str = "10.0.0.0/16") -> str:
-    """Generate Terraform configuration for VPC with subnets"""
-    config = f'''resource "aws_vpc" "{vpc_name}" {{
-  cidr_block           = "{cidr_block}"
+_VPC_TMPL = Template('''resource "aws_vpc" "${name}" {
+  cidr_block           = "${cidr_block}"
   enable_dns_hostnames = true
   enable_dns_support   = true
 
-  tags = {{
-    Name = "{vpc_name}"
-  }}
-}}
+  tags = {
+    Name = "${name}"
+  }
+}
 
-resource "aws_internet_gateway" "{vpc_name}_igw" {{
-  vpc_id = aws_vpc.{vpc_name}.id
+resource "aws_internet_gateway" "${name}_igw" {
+  vpc_id = aws_vpc.${name}.id
 
-  tags = {{
-    Name = "{vpc_name}-igw"
-  }}
-}}
+  tags = {
+    Name = "${name}-igw"
+  }
+}
 
-resource "aws_subnet" "{vpc_name}_public_1" {{
-  vpc_id                  = aws_vpc.{vpc_name}.id
+resource "aws_subnet" "${name}_public_1" {
+  vpc_id                  = aws_vpc.${name}.id
   cidr_block              = "10.0.1.0/24"
   availability_zone       = data.aws_availability_zones.available.names[0]
   map_public_ip_on_launch = true
 
-  tags = {{
-    Name = "{vpc_name}-public-1"
-  }}
-}}
+  tags = {
+    Name = "${name}-public-1"
+  }
+}
 
-resource "aws_subnet" "{vpc_name}_private_1" {{
-  vpc_id            = aws_vpc.{vpc_name}.id
+resource "aws_subnet" "${name}_private_1" {
+  vpc_id            = aws_vpc.${name}.id
   cidr_block        = "10.0.2.0/24"
   availability_zone = data.aws_availability_zones.available.names[0]
 
-  tags = {{
-    Name = "{vpc_name}-private-1"
-  }}
-}}
+  tags = {
+    Name = "${name}-private-1"
+  }
+}
 
-data "aws_availability_zones" "available" {{
+data "aws_availability_zones" "available" {
   state = "available"
-}}'''
-    return config
+}''')
 
-@server.tool()
-def generate_terraform_eks(cluster_name: str, node_group_name: str = None) -> str:
-    """Generate Terraform configuration for EKS cluster"""
-    if not node_group_name:
-        node_group_name = f"{cluster_name}-nodes"
-    
-    config = f'''resource "aws_eks_cluster" "{cluster_name}" {{
-  name     = "{cluster_name}"
-  role_arn = aws_iam_role.{cluster_name}_cluster_role.arn
+_EKS_TMPL = Template('''resource "aws_eks_cluster" "${name}" {
+  name     = "${name}"
+  role_arn = aws_iam_role.${name}_cluster_role.arn
   version  = "1.27"
 
-  vpc_config {{
+  vpc_config {
     subnet_ids = [
-      aws_subnet.{cluster_name}_private_1.id,
-      aws_subnet.{cluster_name}_private_2.id,
-      aws_subnet.{cluster_name}_public_1.id,
-      aws_subnet.{cluster_name}_public_2.id
+      aws_subnet.${name}_private_1.id,
+      aws_subnet.${name}_private_2.id,
+      aws_subnet.${name}_public_1.id,
+      aws_subnet.${name}_public_2.id
     ]
-  }}
+  }
 
   depends_on = [
-    aws_iam_role_policy_attachment.{cluster_name}_cluster_policy,
-    aws_iam_role_policy_attachment.{cluster_name}_service_policy,
+    aws_iam_role_policy_attachment.${name}_cluster_policy,
+    aws_iam_role_policy_attachment.${name}_service_policy,
   ]
-}}
+}
 
-resource "aws_eks_node_group" "{node_group_name}" {{
-  cluster_name    = aws_eks_cluster.{cluster_name}.name
-  node_group_name = "{node_group_name}"
-  node_role_arn   = aws_iam_role.{cluster_name}_node_role.arn
-  subnet_ids      = [aws_subnet.{cluster_name}_private_1.id, aws_subnet.{cluster_name}_private_2.id]
+resource "aws_eks_node_group" "${node_group}" {
+  cluster_name    = aws_eks_cluster.${name}.name
+  node_group_name = "${node_group}"
+  node_role_arn   = aws_iam_role.${name}_node_role.arn
+  subnet_ids      = [aws_subnet.${name}_private_1.id, aws_subnet.${name}_private_2.id]
 
-  scaling_config {{
+  scaling_config {
     desired_size = 2
     max_size     = 4
     min_size     = 1
-  }}
+  }
 
   instance_types = ["t3.medium"]
 
   depends_on = [
-    aws_iam_role_policy_attachment.{cluster_name}_worker_policy,
-    aws_iam_role_policy_attachment.{cluster_name}_cni_policy,
-    aws_iam_role_policy_attachment.{cluster_name}_registry_policy,
+    aws_iam_role_policy_attachment.${name}_worker_policy,
+    aws_iam_role_policy_attachment.${name}_cni_policy,
+    aws_iam_role_policy_attachment.${name}_registry_policy,
   ]
-}}
+}
+
+# IAM roles and policies would be included here...''')
 
-# IAM roles and policies would be included here...'''
-    return config
+@server.tool()
+def generate_terraform_s3(bucket_name: str, versioning: bool = True) -> str:
+    """Generate Terraform configuration for S3 bucket"""
+    return _S3_TMPL.substitute(name=bucket_name.replace('-', '_'), bucket=bucket_name, status='Enabled' if versioning else 'Disabled')
+
+@server.tool()
+def generate_terraform_lambda(function_name: str, runtime: str = "python3.9") -> str:
+    """Generate Terraform configuration for Lambda function"""
+    return _LAMBDA_TMPL.substitute(name=function_name, runtime=runtime)
+
+@server.tool()
+def generate_terraform_vpc(vpc_name: str, cidr_block: str = "10.0.0.0/16") -> str:
+    """Generate Terraform configuration for VPC with subnets"""
+    return _VPC_TMPL.substitute(name=vpc_name, cidr_block=cidr_block)
+
+@server.tool()
+def generate_terraform_eks(cluster_name: str, node_group_name: str = None) -> str:
+    """Generate Terraform configuration for EKS cluster"""
+    if not node_group_name:
+        node_group_name = f"{cluster_name}-nodes"
+    
+    return _EKS_TMPL.substitute(name=cluster_name, node_group=node_group_name)
+
+# Directories that already ran terraform init in this process
+_INITED = set()
+
+# One lock per directory so concurrent calls never run init in the same working directory
+_INIT_LOCKS = {}
+
+async def _run(args: list, directory: str):
+    """Run a command in directory without blocking the event loop"""
+    proc = await asyncio.create_subprocess_exec(
+        *args, cwd=directory,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    return proc.returncode, stdout.decode(), stderr.decode()
+
+async def _ensure_init(directory: str):
+    """Run terraform init once per directory; returns init's stderr if it failed, else None"""
+    key = os.path.realpath(directory)
+    if key in _INITED:
+        return None
+    async with _INIT_LOCKS.setdefault(key, asyncio.Lock()):
+        # Another call may have finished init while this one waited
+        if key in _INITED:
+            return None
+        returncode, _, stderr = await _run(['terraform', 'init', '-input=false'], directory)
+        if returncode != 0:
+            return stderr
+        _INITED.add(key)
+        return None
 
 @server.tool()
-def validate_terraform(directory: str) -> str:
+async def validate_terraform(directory: str) -> str:
     """Validate Terraform configuration"""
     try:
-        result = subprocess.run(['terraform', 'validate'], 
-                               cwd=directory, capture_output=True, text=True)
+        init_error = await _ensure_init(directory)
+        if init_error is not None:
+            return f"❌ Terraform init failed:\n{init_error}"
+        returncode, _, stderr = await _run(['terraform', 'validate'], directory)
         
-        if result.returncode == 0:
+        if returncode == 0:
             return "✅ Terraform configuration is valid"
         else:
-            return f"❌ Terraform validation failed:\n{result.stderr}"
+            return f"❌ Terraform validation failed:\n{stderr}"
     except Exception as e:
         return f"Error validating Terraform: {str(e)}"
 
 @server.tool()
-def terraform_plan(directory: str) -> str:
+async def terraform_plan(directory: str) -> str:
     """Run terraform plan and return output"""
     try:
         # Initialize if needed
-        subprocess.run(['terraform', 'init'], cwd=directory, capture_output=True)
+        init_error = await _ensure_init(directory)
+        if init_error is not None:
+            return f"❌ Terraform init failed:\n{init_error}"
         
         # Run plan
-        result = subprocess.run(['terraform', 'plan'], 
-                               cwd=directory, capture_output=True, text=True)
+        _, stdout, stderr = await _run(['terraform', 'plan', '-input=false'], directory)
         
-        return f"Terraform Plan Output:\n{result.stdout}\n{result.stderr}"
+        return f"Terraform Plan Output:\n{stdout}\n{stderr}"
     except Exception as e:
         return f"Error running terraform plan: {str(e)}"
 
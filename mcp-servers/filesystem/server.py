@@ -2,17 +2,32 @@
 Simple Filesystem MCP Server
 """
 import os
-import json
+import asyncio
+import orjson
+import functools
+import itertools
 from bedrock_agentcore.mcp import MCPServer
 
 server = MCPServer()
 
 ALLOWED_PATHS = os.getenv('ALLOWED_PATHS', '/app/data').split(':')
 
+# Most characters read_file returns
+READ_LIMIT = 2000
+
+# Allowed roots resolved once, each with a trailing separator so /app/data does not admit /app/data-evil;
+# both the given and the symlink-resolved spelling of a root are accepted
+_ALLOWED = tuple({
+    root.rstrip(os.sep) + os.sep
+    for p in ALLOWED_PATHS if p
+    for root in (os.path.normpath(os.path.abspath(p)), os.path.realpath(p))
+})
+
+@functools.lru_cache(maxsize=2048)
 def is_path_allowed(path):
     """Check if path is within allowed directories"""
-    abs_path = os.path.abspath(path)
-    return any(abs_path.startswith(allowed) for allowed in ALLOWED_PATHS)
+    abs_path = os.path.normpath(os.path.abspath(path))
+    return any(abs_path == allowed[:-1] or abs_path.startswith(allowed) for allowed in _ALLOWED)
 
 @server.tool()
 def read_file(file_path: str) -> str:
@@ -21,9 +36,12 @@ def read_file(file_path: str) -> str:
         return "Access denied: Path not allowed"
     
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-            return content[:2000]  # Limit content size
+        # Read only the characters returned, not the whole file
+        with open(file_path, 'r', buffering=READ_LIMIT) as f:
+            return f.read(READ_LIMIT)
+    except UnicodeDecodeError:
+        with open(file_path, 'rb') as f:
+            return f.read(READ_LIMIT).decode('utf-8', errors='replace')
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
@@ -34,15 +52,14 @@ def list_directory(directory_path: str) -> str:
         return "Access denied: Path not allowed"
     
     try:
-        files = []
-        for item in os.listdir(directory_path):
-            item_path = os.path.join(directory_path, item)
-            files.append({
-                "name": item,
-                "type": "directory" if os.path.isdir(item_path) else "file",
-                "size": os.path.getsize(item_path) if os.path.isfile(item_path) else None
-            })
-        return json.dumps(files[:50])  # Limit to 50 items
+        # One directory read; DirEntry caches the entry type, and stops after 50 entries
+        with os.scandir(directory_path) as it:
+            files = [{
+                "name": entry.name,
+                "type": "directory" if entry.is_dir() else "file",
+                "size": entry.stat().st_size if entry.is_file() else None
+            } for entry in itertools.islice(it, 50)]  # Limit to 50 items
+        return orjson.dumps(files).decode()
     except Exception as e:
         return f"Error listing directory: {str(e)}"
 
@@ -61,9 +78,15 @@ def file_info(file_path: str) -> str:
             "is_file": os.path.isfile(file_path),
             "is_directory": os.path.isdir(file_path)
         }
-        return json.dumps(info)
+        return orjson.dumps(info).decode()
     except Exception as e:
         return f"Error getting file info: {str(e)}"
 
 if __name__ == "__main__":
+    # uvloop is optional; fall back to the default asyncio loop when it is not installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     server.run(host="0.0.0.0", port=8000)
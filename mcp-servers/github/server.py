@@ -2,35 +2,163 @@
 GitHub MCP Server - GitHub repository and operations management
 """
 from bedrock_agentcore.mcp import MCPServer
-import requests
-import json
+import httpx
+import asyncio
+import atexit
+import orjson
 import os
+import re
+import time
 import base64
+import codecs
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+
+# hishel is optional; the on-disk cache is only used when it is installed and GITHUB_CACHE_DIR is set
+try:
+    import hishel
+except ImportError:
+    hishel = None
 
 server = MCPServer()
 
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
 GITHUB_API_BASE = 'https://api.github.com'
+_GRAPHQL_URL = f"{GITHUB_API_BASE}/graphql"
+_SEARCH_REPOS_URL = f"{GITHUB_API_BASE}/search/repositories"
+# Opt-in: cached bodies can include private-repo content, so there is no shared default location
+GITHUB_CACHE_DIR = os.getenv('GITHUB_CACHE_DIR')
+GITHUB_CACHE_TTL = 300
+_DISK_CACHE = bool(GITHUB_CACHE_DIR) and hishel is not None
+
+# GitHub API headers, built once at import and read-only afterwards
+_HEADERS = {'Accept': 'application/vnd.github.v3+json'}
+if GITHUB_TOKEN:
+    _HEADERS['Authorization'] = f'token {GITHUB_TOKEN}'
+_HEADERS = MappingProxyType(_HEADERS)
+
+def _dumps(obj, indent: bool = False) -> str:
+    """Encode a tool result with orjson, optionally with two-space indentation"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+# One HTTP/2 connection pool for every GitHub call, created on the server's event loop at first use;
+# concurrent tool calls are multiplexed over a single connection to api.github.com
+_SESSION = None
+_SESSION_LOOP = None
+
+def _transport() -> httpx.AsyncBaseTransport:
+    """HTTP/2 transport, behind hishel's on-disk cache when enabled so restarts start warm"""
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    )
+    if not _DISK_CACHE:
+        return transport
+    # Owner-only directory, so other local users cannot read responses fetched with the token
+    os.makedirs(GITHUB_CACHE_DIR, mode=0o700, exist_ok=True)
+    os.chmod(GITHUB_CACHE_DIR, 0o700)
+    storage = hishel.AsyncFileStorage(base_path=Path(GITHUB_CACHE_DIR), ttl=GITHUB_CACHE_TTL)
+    return hishel.AsyncCacheTransport(transport=transport, storage=storage)
 
-def get_headers():
-    """Get GitHub API headers"""
-    headers = {'Accept': 'application/vnd.github.v3+json'}
-    if GITHUB_TOKEN:
-        headers['Authorization'] = f'token {GITHUB_TOKEN}'
-    return headers
+async def get_session() -> httpx.AsyncClient:
+    """Return the shared GitHub API client, creating it on first use"""
+    global _SESSION, _SESSION_LOOP
+    if _SESSION is None or _SESSION.is_closed:
+        _SESSION = httpx.AsyncClient(
+            transport=_transport(),
+            headers=_HEADERS,
+            timeout=httpx.Timeout(30.0, connect=10.0)
+        )
+        _SESSION_LOOP = asyncio.get_running_loop()
+    return _SESSION
+
+# (url, params) -> (etag, decoded JSON, monotonic time the body stays fresh until, body bytes), oldest first;
+# bounded by total body size, since one entry can be a base64 file of up to ~1 MB
+_ETAG_CACHE = OrderedDict()
+_ETAG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_ETAG_ENTRY_MAX_BYTES = 256 * 1024
+_ETAG_CACHE_BYTES = 0
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+def _etag_cache_drop(key):
+    """Remove key from the ETag cache and release its bytes"""
+    global _ETAG_CACHE_BYTES
+    entry = _ETAG_CACHE.pop(key, None)
+    if entry:
+        _ETAG_CACHE_BYTES -= entry[3]
+
+def _etag_cache_put(key, entry):
+    """Store entry, evicting the oldest entries until the cache fits its byte budget"""
+    global _ETAG_CACHE_BYTES
+    _etag_cache_drop(key)
+    if entry[3] > _ETAG_ENTRY_MAX_BYTES:
+        return
+    _ETAG_CACHE[key] = entry
+    _ETAG_CACHE_BYTES += entry[3]
+    while _ETAG_CACHE_BYTES > _ETAG_CACHE_MAX_BYTES:
+        _etag_cache_drop(next(iter(_ETAG_CACHE)))
+
+async def _get_json(url: str, params: dict = None):
+    """GET a GitHub API URL on the shared session, revalidating cached bodies by ETag"""
+    session = await get_session()
+    if _DISK_CACHE:
+        # hishel already stores and revalidates this response; keeping it in memory too would cache it twice
+        response = await session.get(url, params=params)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    key = (url, tuple(sorted((params or {}).items())))
+    entry = _ETAG_CACHE.get(key)
+    
+    # Within Cache-Control max-age GitHub would only answer 304, so skip the request
+    if entry and time.monotonic() < entry[2]:
+        return entry[1]
+    
+    # A 304 reply does not count against the primary rate limit
+    headers = {'If-None-Match': entry[0]} if entry and entry[0] else None
+    response = await session.get(url, params=params, headers=headers)
+    if response.status_code == 304 and entry:
+        data, size = entry[1], entry[3]
+    else:
+        response.raise_for_status()
+        data, size = orjson.loads(response.content), len(response.content)
+    etag = response.headers.get('ETag')
+    max_age = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+    
+    if etag or max_age:
+        _etag_cache_put(key, (etag, data, time.monotonic() + (int(max_age.group(1)) if max_age else 0), size))
+    return data
+
+async def gql(query: str, variables: dict) -> dict:
+    """POST a GraphQL query on the shared session and return its data; needs GITHUB_TOKEN"""
+    session = await get_session()
+    response = await session.post(_GRAPHQL_URL, json={'query': query, 'variables': variables})
+    response.raise_for_status()
+    body = orjson.loads(response.content)
+    if body.get('data') is None:
+        raise RuntimeError(body.get('errors', [{}])[0].get('message', 'GraphQL query failed'))
+    return body['data']
+
+def _close_session():
+    """Close the shared session at exit if its event loop is still usable"""
+    if _SESSION is not None and not _SESSION.is_closed and not _SESSION_LOOP.is_closed() \
+            and not _SESSION_LOOP.is_running():
+        _SESSION_LOOP.run_until_complete(_SESSION.aclose())
+
+atexit.register(_close_session)
 
 @server.tool()
-def list_repositories(username: str, type: str = "owner") -> str:
+async def list_repositories(username: str, type: str = "owner") -> str:
     """List repositories for a user or organization"""
     try:
         url = f"{GITHUB_API_BASE}/users/{username}/repos"
         params = {'type': type, 'sort': 'updated', 'per_page': 20}
         
-        response = requests.get(url, headers=get_headers(), params=params)
-        response.raise_for_status()
+        data = await _get_json(url, params)
         
         repos = []
-        for repo in response.json():
+        for repo in data:
             repos.append({
                 'name': repo['name'],
                 'full_name': repo['full_name'],
@@ -42,50 +170,113 @@ def list_repositories(username: str, type: str = "owner") -> str:
                 'html_url': repo['html_url']
             })
         
-        return json.dumps(repos, indent=2)
+        return _dumps(repos, indent=True)
     except Exception as e:
         return f"Error listing repositories: {str(e)}"
 
+# Repository fields fetched over GraphQL, matching what the REST repository endpoint reports
+_REPO_FIELDS = """
+    name nameWithOwner description url diskUsage stargazerCount forkCount createdAt updatedAt
+    primaryLanguage { name }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    repositoryTopics(first: 20) { nodes { topic { name } } }
+"""
+
+def _repo_info_from_rest(repo_data: dict) -> dict:
+    """Shape a REST repository payload into the tool's output"""
+    return {
+        'name': repo_data['name'],
+        'full_name': repo_data['full_name'],
+        'description': repo_data['description'],
+        'language': repo_data['language'],
+        'size': repo_data['size'],
+        'stars': repo_data['stargazers_count'],
+        'forks': repo_data['forks_count'],
+        'open_issues': repo_data['open_issues_count'],
+        'created_at': repo_data['created_at'],
+        'updated_at': repo_data['updated_at'],
+        'clone_url': repo_data['clone_url'],
+        'topics': repo_data.get('topics', [])
+    }
+
+def _repo_info_from_graphql(node: dict) -> dict:
+    """Shape a GraphQL repository node into the same output as the REST path"""
+    return {
+        'name': node['name'],
+        'full_name': node['nameWithOwner'],
+        'description': node['description'],
+        'language': (node['primaryLanguage'] or {}).get('name'),
+        'size': node['diskUsage'],
+        'stars': node['stargazerCount'],
+        'forks': node['forkCount'],
+        # REST counts open pull requests as issues too
+        'open_issues': node['issues']['totalCount'] + node['pullRequests']['totalCount'],
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'clone_url': f"{node['url']}.git",
+        'topics': [n['topic']['name'] for n in node['repositoryTopics']['nodes']]
+    }
+
+async def _repo_infos(repos: list) -> list:
+    """Look up (owner, repo) pairs in one aliased GraphQL query; None for repos that do not exist"""
+    params = ", ".join(f"$o{i}: String!, $n{i}: String!" for i in range(len(repos)))
+    fields = " ".join(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ {_REPO_FIELDS} }}" for i in range(len(repos)))
+    variables = {}
+    for i, (owner, repo) in enumerate(repos):
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = repo
+    
+    data = await gql(f"query({params}) {{ {fields} }}", variables)
+    return [_repo_info_from_graphql(data[f"r{i}"]) if data.get(f"r{i}") else None for i in range(len(repos))]
+
 @server.tool()
-def get_repository_info(owner: str, repo: str) -> str:
+async def get_repository_info(owner: str, repo: str) -> str:
     """Get detailed information about a repository"""
     try:
-        url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
-        response = requests.get(url, headers=get_headers())
-        response.raise_for_status()
+        if GITHUB_TOKEN:
+            info = (await _repo_infos([(owner, repo)]))[0]
+            if info is None:
+                return f"Error getting repository info: {owner}/{repo} not found"
+        else:
+            # GraphQL requires authentication, so anonymous calls stay on REST
+            info = _repo_info_from_rest(await _get_json(f"{GITHUB_API_BASE}/repos/{owner}/{repo}"))
         
-        repo_data = response.json()
-        info = {
-            'name': repo_data['name'],
-            'full_name': repo_data['full_name'],
-            'description': repo_data['description'],
-            'language': repo_data['language'],
-            'size': repo_data['size'],
-            'stars': repo_data['stargazers_count'],
-            'forks': repo_data['forks_count'],
-            'open_issues': repo_data['open_issues_count'],
-            'created_at': repo_data['created_at'],
-            'updated_at': repo_data['updated_at'],
-            'clone_url': repo_data['clone_url'],
-            'topics': repo_data.get('topics', [])
-        }
-        
-        return json.dumps(info, indent=2)
+        return _dumps(info, indent=True)
     except Exception as e:
         return f"Error getting repository info: {str(e)}"
 
 @server.tool()
-def list_commits(owner: str, repo: str, limit: int = 10) -> str:
+async def bulk_repo_info(repos: list) -> str:
+    """Get information about several repositories, given as "owner/repo" strings, in one request"""
+    try:
+        if not repos:
+            return _dumps({})
+        pairs = [tuple(r.split('/', 1)) for r in repos]
+        
+        if GITHUB_TOKEN:
+            infos = [info or {'error': 'not found'} for info in await _repo_infos(pairs)]
+        else:
+            # GraphQL requires authentication; look the repositories up concurrently over REST instead
+            payloads = await asyncio.gather(*(_get_json(f"{GITHUB_API_BASE}/repos/{owner}/{repo}")
+                                              for owner, repo in pairs), return_exceptions=True)
+            infos = [{'error': str(p)} if isinstance(p, Exception) else _repo_info_from_rest(p) for p in payloads]
+        
+        return _dumps(dict(zip(repos, infos)), indent=True)
+    except Exception as e:
+        return f"Error getting repository info: {str(e)}"
+
+@server.tool()
+async def list_commits(owner: str, repo: str, limit: int = 10) -> str:
     """List recent commits for a repository"""
     try:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/commits"
         params = {'per_page': limit}
         
-        response = requests.get(url, headers=get_headers(), params=params)
-        response.raise_for_status()
+        data = await _get_json(url, params)
         
         commits = []
-        for commit in response.json():
+        for commit in data:
             commits.append({
                 'sha': commit['sha'][:8],
                 'message': commit['commit']['message'].split('\n')[0],
@@ -94,22 +285,21 @@ def list_commits(owner: str, repo: str, limit: int = 10) -> str:
                 'url': commit['html_url']
             })
         
-        return json.dumps(commits, indent=2)
+        return _dumps(commits, indent=True)
     except Exception as e:
         return f"Error listing commits: {str(e)}"
 
 @server.tool()
-def list_issues(owner: str, repo: str, state: str = "open", limit: int = 10) -> str:
+async def list_issues(owner: str, repo: str, state: str = "open", limit: int = 10) -> str:
     """List issues for a repository"""
     try:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues"
         params = {'state': state, 'per_page': limit}
         
-        response = requests.get(url, headers=get_headers(), params=params)
-        response.raise_for_status()
+        data = await _get_json(url, params)
         
         issues = []
-        for issue in response.json():
+        for issue in data:
             if 'pull_request' not in issue:  # Exclude pull requests
                 issues.append({
                     'number': issue['number'],
@@ -121,22 +311,21 @@ def list_issues(owner: str, repo: str, state: str = "open", limit: int = 10) ->
                     'html_url': issue['html_url']
                 })
         
-        return json.dumps(issues, indent=2)
+        return _dumps(issues, indent=True)
     except Exception as e:
         return f"Error listing issues: {str(e)}"
 
 @server.tool()
-def list_pull_requests(owner: str, repo: str, state: str = "open", limit: int = 10) -> str:
+async def list_pull_requests(owner: str, repo: str, state: str = "open", limit: int = 10) -> str:
     """List pull requests for a repository"""
     try:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls"
         params = {'state': state, 'per_page': limit}
         
-        response = requests.get(url, headers=get_headers(), params=params)
-        response.raise_for_status()
+        data = await _get_json(url, params)
         
         prs = []
-        for pr in response.json():
+        for pr in data:
             prs.append({
                 'number': pr['number'],
                 'title': pr['title'],
@@ -148,42 +337,51 @@ def list_pull_requests(owner: str, repo: str, state: str = "open", limit: int =
                 'html_url': pr['html_url']
             })
         
-        return json.dumps(prs, indent=2)
+        return _dumps(prs, indent=True)
     except Exception as e:
         return f"Error listing pull requests: {str(e)}"
 
+# get_file_content shows this many characters; UTF-8 needs at most 4 bytes per character,
+# so one byte past 4x the limit is enough to tell whether the file is longer
+PREVIEW_CHARS = 2000
+_PREVIEW_B64 = -(-(PREVIEW_CHARS * 4 + 4) // 3) * 4
+
+def _decode_preview(b64: str) -> str:
+    """Decode only the base64 prefix needed for the preview instead of the whole file"""
+    b64 = b64.replace('\n', '')
+    if len(b64) <= _PREVIEW_B64:
+        return base64.b64decode(b64).decode('utf-8')
+    # The prefix may end mid-character; the incremental decoder holds those bytes back
+    return codecs.getincrementaldecoder('utf-8')().decode(base64.b64decode(b64[:_PREVIEW_B64]))
+
 @server.tool()
-def get_file_content(owner: str, repo: str, path: str, branch: str = "main") -> str:
+async def get_file_content(owner: str, repo: str, path: str, branch: str = "main") -> str:
     """Get content of a file from repository"""
     try:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}"
         params = {'ref': branch}
         
-        response = requests.get(url, headers=get_headers(), params=params)
-        response.raise_for_status()
+        file_data = await _get_json(url, params)
         
-        file_data = response.json()
         
         if file_data['type'] == 'file':
-            content = base64.b64decode(file_data['content']).decode('utf-8')
-            return f"File: {path}\nSize: {file_data['size']} bytes\n\nContent:\n{content[:2000]}{'...' if len(content) > 2000 else ''}"
+            content = _decode_preview(file_data['content'])
+            return f"File: {path}\nSize: {file_data['size']} bytes\n\nContent:\n{content[:PREVIEW_CHARS]}{'...' if len(content) > PREVIEW_CHARS else ''}"
         else:
             return f"Path {path} is not a file"
     except Exception as e:
         return f"Error getting file content: {str(e)}"
 
 @server.tool()
-def search_repositories(query: str, sort: str = "stars", limit: int = 10) -> str:
+async def search_repositories(query: str, sort: str = "stars", limit: int = 10) -> str:
     """Search GitHub repositories"""
     try:
-        url = f"{GITHUB_API_BASE}/search/repositories"
         params = {'q': query, 'sort': sort, 'per_page': limit}
         
-        response = requests.get(url, headers=get_headers(), params=params)
-        response.raise_for_status()
+        data = await _get_json(_SEARCH_REPOS_URL, params)
         
         results = []
-        for repo in response.json()['items']:
+        for repo in data['items']:
             results.append({
                 'name': repo['name'],
                 'full_name': repo['full_name'],
@@ -194,9 +392,15 @@ def search_repositories(query: str, sort: str = "stars", limit: int = 10) -> str
                 'html_url': repo['html_url']
             })
         
-        return json.dumps(results, indent=2)
+        return _dumps(results, indent=True)
     except Exception as e:
         return f"Error searching repositories: {str(e)}"
 
 if __name__ == "__main__":
+    # uvloop is optional; fall back to the default asyncio loop when it is not installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     server.run(host="0.0.0.0", port=8004)
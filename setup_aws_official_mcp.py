@@ -5,31 +5,85 @@ import subprocess
 import os
 import json
 
+COMBINED_REQUIREMENTS = '/tmp/combined-req.txt'
+
 def clone_aws_mcp_repo():
     """Clone the official AWS MCP repository"""
     if not os.path.exists('aws-mcp'):
         print("📥 Cloning official AWS MCP repository...")
-        subprocess.run(['git', 'clone', 'https://github.com/awslabs/mcp.git', 'aws-mcp'], check=True)
+        # Shallow, blob-filtered clone: setup only needs the current tree, not history
+        subprocess.run(['git', 'clone', '--depth=1', '--filter=blob:none', '--single-branch',
+                        'https://github.com/awslabs/mcp.git', 'aws-mcp'], check=True)
     else:
         print("📁 AWS MCP repository already exists")
 
-def setup_mcp_server(server_name, port):
-    """Setup individual MCP server"""
-    server_path = f"aws-mcp/{server_name}"
-    
-    if not os.path.exists(server_path):
-        print(f"❌ Server {server_name} not found in repository")
-        return False
-    
-    print(f"🔧 Setting up {server_name} on port {port}...")
+# Requirement-file options whose value is a path relative to the file that contains it
+_PATH_OPTIONS = ('-r', '--requirement', '-c', '--constraint', '-e', '--editable')
+
+def _absolutize(line, base):
+    """Rewrite a requirements line so local paths resolve against base rather than the CWD"""
+    option, sep, value = '', '', line
+    for opt in _PATH_OPTIONS:
+        if line.startswith(opt + ' ') or line.startswith(opt + '='):
+            option, sep, value = opt, line[len(opt)], line[len(opt) + 1:].strip()
+            break
+    is_path = value.startswith(('.', '/')) or (option in ('-r', '--requirement', '-c', '--constraint')
+                                               and '://' not in value)
+    if not is_path:
+        return line
+    return f"{option}{sep}{os.path.abspath(os.path.join(base, value))}"
+
+def install_dependencies(servers):
+    """Install every server's dependencies with one pip run and one npm run, per server on failure"""
+    requirements = set()
+    python_servers = []
+    workspaces = []
+    for server_name in servers:
+        server_path = f"aws-mcp/{server_name}"
+        if os.path.exists(f"{server_path}/requirements.txt"):
+            python_servers.append(server_path)
+            with open(f"{server_path}/requirements.txt") as f:
+                requirements.update(_absolutize(line.strip(), server_path) for line in f
+                                    if line.strip() and not line.lstrip().startswith('#'))
+        elif os.path.exists(f"{server_path}/package.json"):
+            workspaces.append(server_name)
     
-    # Install dependencies
-    if os.path.exists(f"{server_path}/requirements.txt"):
-        subprocess.run(['pip', 'install', '-r', f"{server_path}/requirements.txt"], check=True)
-    elif os.path.exists(f"{server_path}/package.json"):
-        subprocess.run(['npm', 'install'], cwd=server_path, check=True)
+    # One resolver run, so shared dependencies are resolved and downloaded once
+    if requirements:
+        print(f"📦 Installing {len(requirements)} Python requirements...")
+        with open(COMBINED_REQUIREMENTS, 'w') as f:
+            f.write('\n'.join(sorted(requirements)) + '\n')
+        if subprocess.run(['pip', 'install', '-r', COMBINED_REQUIREMENTS]).returncode != 0:
+            # Conflicting pins between servers; install each on its own so one conflict fails one server
+            print("⚠️ Combined install failed, installing servers one at a time...")
+            for server_path in python_servers:
+                if subprocess.run(['pip', 'install', '-r', 'requirements.txt'], cwd=server_path).returncode != 0:
+                    print(f"❌ Failed to install dependencies for {server_path}")
     
-    return True
+    if workspaces:
+        print(f"📦 Installing {len(workspaces)} Node.js servers...")
+        # Node servers become workspaces of a temporary root package inside the clone, never the CWD;
+        # if the clone already has a root package.json, leave it alone and install per server
+        root_package = 'aws-mcp/package.json'
+        root_lock = 'aws-mcp/package-lock.json'
+        if not os.path.exists(root_package):
+            generated = [root_package] if os.path.exists(root_lock) else [root_package, root_lock]
+            try:
+                with open(root_package, 'w') as f:
+                    json.dump({"name": "aws-mcp-servers", "private": True, "workspaces": workspaces}, f, indent=2)
+                installed = subprocess.run(['npm', 'install'], cwd='aws-mcp').returncode == 0
+            finally:
+                # Remove the generated manifest and lockfile so the clone stays clean and later runs
+                # do not mistake them for an upstream root package; node_modules stays for the servers
+                for path in generated:
+                    if os.path.exists(path):
+                        os.remove(path)
+            if installed:
+                return
+            print("⚠️ Workspace install failed, installing servers one at a time...")
+        for server_name in workspaces:
+            if subprocess.run(['npm', 'install'], cwd=f"aws-mcp/{server_name}").returncode != 0:
+                print(f"❌ Failed to install dependencies for aws-mcp/{server_name}")
 
 def main():
     """Setup all official AWS MCP servers"""
@@ -40,23 +94,24 @@ def main():
     # List available servers
     aws_mcp_path = 'aws-mcp'
     if os.path.exists(aws_mcp_path):
-        servers = [d for d in os.listdir(aws_mcp_path) 
-                  if os.path.isdir(os.path.join(aws_mcp_path, d)) and not d.startswith('.')]
+        with os.scandir(aws_mcp_path) as it:
+            servers = [e.name for e in it if e.is_dir() and not e.name.startswith('.')]
         
         print(f"📋 Available AWS MCP servers: {servers}")
         
-        # Setup each server
-        port = 8000
-        server_config = {}
+        install_dependencies(servers)
         
+        # Assign each server its own port
+        server_config = {}
+        port = 8000
         for server in servers:
-            if setup_mcp_server(server, port):
-                server_config[server] = {
-                    "path": f"aws-mcp/{server}",
-                    "port": port,
-                    "url": f"http://localhost:{port}"
-                }
-                port += 1
+            print(f"🔧 Setting up {server} on port {port}...")
+            server_config[server] = {
+                "path": f"aws-mcp/{server}",
+                "port": port,
+                "url": f"http://localhost:{port}"
+            }
+            port += 1
         
         # Save configuration
         with open('aws_mcp_config.json', 'w') as f:
@@ -6,32 +6,48 @@ import json
 import uuid
 import subprocess
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
+from common.iam_retry import retry_until_iam_ready
 
 def clone_official_aws_mcp():
     """Clone official AWS MCP repository"""
     if not os.path.exists('aws-mcp'):
         print("📥 Cloning official AWS MCP repository...")
-        subprocess.run(['git', 'clone', 'https://github.com/awslabs/mcp.git', 'aws-mcp'], check=True)
+        # Shallow, blob-filtered clone: setup only needs the current tree, not history
+        subprocess.run(['git', 'clone', '--depth=1', '--filter=blob:none', '--single-branch',
+                        'https://github.com/awslabs/mcp.git', 'aws-mcp'], check=True)
     return 'aws-mcp'
 
+def _probe(server_path):
+    """Describe a candidate server directory from one listing, or None if it is not an MCP server"""
+    try:
+        with os.scandir(server_path) as it:
+            names = {e.name for e in it}
+    except OSError:
+        return None
+    if 'main.py' in names or 'server.py' in names:
+        server_type = 'python'
+    elif 'index.js' in names:
+        server_type = 'node'
+    else:
+        return None
+    return {
+        'name': os.path.basename(server_path),
+        'path': server_path,
+        'type': server_type
+    }
+
 def discover_mcp_servers(aws_mcp_path):
     """Discover available official MCP servers"""
-    servers = []
-    if os.path.exists(aws_mcp_path):
-        for item in os.listdir(aws_mcp_path):
-            server_path = os.path.join(aws_mcp_path, item)
-            if os.path.isdir(server_path) and not item.startswith('.'):
-                # Check if it's a valid MCP server
-                if (os.path.exists(os.path.join(server_path, 'main.py')) or 
-                    os.path.exists(os.path.join(server_path, 'server.py')) or
-                    os.path.exists(os.path.join(server_path, 'index.js'))):
-                    servers.append({
-                        'name': item,
-                        'path': server_path,
-                        'type': 'python' if os.path.exists(os.path.join(server_path, 'main.py')) else 'node'
-                    })
-    return servers
+    if not os.path.exists(aws_mcp_path):
+        return []
+    # DirEntry.is_dir() comes from the listing itself, so files are skipped without a stat
+    with os.scandir(aws_mcp_path) as it:
+        candidates = [e.path for e in it if e.is_dir() and not e.name.startswith('.')]
+    
+    # Probe candidate directories concurrently
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        return [server for server in ex.map(_probe, candidates) if server]
 
 def create_lambda_proxy_for_mcp(server_info):
     """Create Lambda function code that proxies to MCP server"""
@@ -40,29 +56,66 @@ def create_lambda_proxy_for_mcp(server_info):
     
     lambda_code = f'''
 import json
-import subprocess
 import asyncio
+import atexit
 import os
-from mcp import ClientSession
+from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-async def call_mcp_tool(tool_name, arguments):
-    """Call tool on MCP server via stdio"""
-    server_path = "{server_path}"
-    
-    if os.path.exists(os.path.join(server_path, "main.py")):
-        cmd = ["python", os.path.join(server_path, "main.py")]
-    elif os.path.exists(os.path.join(server_path, "server.py")):
-        cmd = ["python", os.path.join(server_path, "server.py")]
-    else:
-        cmd = ["node", os.path.join(server_path, "index.js")]
-    
+SERVER_PATH = "{server_path}"
+
+if os.path.exists(os.path.join(SERVER_PATH, "main.py")):
+    CMD = ["python", os.path.join(SERVER_PATH, "main.py")]
+elif os.path.exists(os.path.join(SERVER_PATH, "server.py")):
+    CMD = ["python", os.path.join(SERVER_PATH, "server.py")]
+else:
+    CMD = ["node", os.path.join(SERVER_PATH, "index.js")]
+
+# Kept in global scope so warm invocations reuse the server process and initialized session
+_LOOP = asyncio.new_event_loop()
+_SESSION = None
+_HOLDER = None
+_STOP = None
+
+async def _hold(ready):
+    """Own the server process and session so they are entered and exited in one task"""
+    global _SESSION
     try:
-        async with stdio_client(cmd) as (read, write):
+        async with stdio_client(StdioServerParameters(command=CMD[0], args=CMD[1:])) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
-                result = await session.call_tool(tool_name, arguments)
-                return result.content[0].text if result.content else "No result"
+                ready.set_result(session)
+                await _STOP.wait()
+    except Exception as e:
+        if not ready.done():
+            ready.set_exception(e)
+    finally:
+        # Drop a dead server so the next invocation respawns it
+        _SESSION = None
+
+async def _get_session():
+    """Return the live session, spawning the server on a cold start"""
+    global _SESSION, _HOLDER, _STOP
+    if _SESSION is None:
+        _STOP = asyncio.Event()
+        _SESSION = asyncio.get_running_loop().create_future()
+        _HOLDER = asyncio.ensure_future(_hold(_SESSION))
+    return await asyncio.shield(_SESSION)
+
+def _close():
+    """Stop the server process when the execution environment shuts down"""
+    if _HOLDER is not None and not _HOLDER.done():
+        _STOP.set()
+        _LOOP.run_until_complete(_HOLDER)
+
+atexit.register(_close)
+
+async def call_mcp_tool(tool_name, arguments):
+    """Call tool on MCP server via stdio"""
+    try:
+        session = await _get_session()
+        result = await session.call_tool(tool_name, arguments)
+        return result.content[0].text if result.content else "No result"
     except Exception as e:
         return f"MCP call error: {{str(e)}}"
 
@@ -73,8 +126,8 @@ def lambda_handler(event, context):
         tool_name = event.get("tool_name")
         arguments = event.get("arguments", {{}})
         
-        # Call MCP server
-        result = asyncio.run(call_mcp_tool(tool_name, arguments))
+        # Call MCP server on the persistent loop that owns the session
+        result = _LOOP.run_until_complete(call_mcp_tool(tool_name, arguments))
         
         return {{
             "statusCode": 200,
@@ -150,31 +203,31 @@ def setup_gateway_with_official_mcp():
     print("🔧 Configuring IAM permissions...")
     client.fix_iam_permissions(gateway)
     
-    # Wait for IAM propagation
-    print("⏳ Waiting for IAM propagation...")
-    time.sleep(30)
-    
-    # Add each official MCP server as a Lambda target
-    targets = {}
-    for server_info in servers:
+    # Add each official MCP server as a Lambda target; targets are independent, so create them concurrently
+    def add_target(server_info):
         print(f"🎯 Adding {server_info['name']} as gateway target...")
         
-        try:
-            # Create Lambda proxy for this MCP server
-            lambda_payload = create_lambda_proxy_for_mcp(server_info)
-            
-            target = client.create_mcp_gateway_target(
-                gateway=gateway,
-                name=f"Official_{server_info['name'].replace('-', '_')}",
-                target_type="lambda",
-                target_payload=lambda_payload
-            )
-            
-            targets[server_info['name']] = target
-            print(f"✅ Added {server_info['name']} target")
-            
-        except Exception as e:
-            print(f"❌ Failed to add {server_info['name']}: {e}")
+        # Create Lambda proxy for this MCP server
+        lambda_payload = create_lambda_proxy_for_mcp(server_info)
+        
+        # Retrying on AccessDenied replaces a fixed wait for IAM propagation
+        return retry_until_iam_ready(
+            client.create_mcp_gateway_target,
+            gateway=gateway,
+            name=f"Official_{server_info['name'].replace('-', '_')}",
+            target_type="lambda",
+            target_payload=lambda_payload
+        )
+    
+    targets = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(servers))) as ex:
+        futures = [(server_info, ex.submit(add_target, server_info)) for server_info in servers]
+        for server_info, future in futures:
+            try:
+                targets[server_info['name']] = future.result()
+                print(f"✅ Added {server_info['name']} target")
+            except Exception as e:
+                print(f"❌ Failed to add {server_info['name']}: {e}")
     
     # Get access token
     print("🔑 Getting access token...")
@@ -4,106 +4,85 @@ Setup multiple MCP servers and AgentCore Gateway targets
 from bedrock_agentcore_starter_toolkit.operations.gateway.client import GatewayClient
 import json
 import uuid
-import time
+from concurrent.futures import ThreadPoolExecutor
+from common.iam_retry import retry_until_iam_ready
 
-def setup_filesystem_mcp_target(gateway_client, gateway):
-    """Add filesystem MCP server as gateway target"""
-    filesystem_schema = {
-        "inlinePayload": [
-            {
-                "name": "read_file",
-                "description": "Read contents of a file",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {"type": "string", "description": "Path to the file"}
-                    },
-                    "required": ["file_path"]
-                }
-            },
-            {
-                "name": "list_directory",
-                "description": "List contents of a directory",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "directory_path": {"type": "string", "description": "Path to the directory"}
-                    },
-                    "required": ["directory_path"]
-                }
+# Config key -> (gateway target name, inline tool schemas); each becomes one Lambda target
+TARGETS = {
+    "filesystem": ("FilesystemMCP", [
+        {
+            "name": "read_file",
+            "description": "Read contents of a file",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "file_path": {"type": "string", "description": "Path to the file"}
+                },
+                "required": ["file_path"]
             }
-        ]
-    }
-    
-    return gateway_client.create_mcp_gateway_target(
-        gateway=gateway,
-        name="FilesystemMCP",
-        target_type="lambda",
-        target_payload={"toolSchema": filesystem_schema}
-    )
-
-def setup_database_mcp_target(gateway_client, gateway):
-    """Add database MCP server as gateway target"""
-    database_schema = {
-        "inlinePayload": [
-            {
-                "name": "query_database",
-                "description": "Execute a database query",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "SQL query to execute"},
-                        "database": {"type": "string", "description": "Database name", "default": "main"}
-                    },
-                    "required": ["query"]
-                }
+        },
+        {
+            "name": "list_directory",
+            "description": "List contents of a directory",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "directory_path": {"type": "string", "description": "Path to the directory"}
+                },
+                "required": ["directory_path"]
             }
-        ]
-    }
-    
-    return gateway_client.create_mcp_gateway_target(
-        gateway=gateway,
-        name="DatabaseMCP",
-        target_type="lambda",
-        target_payload={"toolSchema": database_schema}
-    )
-
-def setup_web_mcp_target(gateway_client, gateway):
-    """Add web scraping MCP server as gateway target"""
-    web_schema = {
-        "inlinePayload": [
-            {
-                "name": "scrape_website",
-                "description": "Scrape content from a website",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "url": {"type": "string", "description": "URL to scrape"},
-                        "selector": {"type": "string", "description": "CSS selector (optional)"}
-                    },
-                    "required": ["url"]
-                }
-            },
-            {
-                "name": "search_google",
-                "description": "Search Google for information",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search query"},
-                        "num_results": {"type": "integer", "description": "Number of results", "default": 5}
-                    },
-                    "required": ["query"]
-                }
+        }
+    ]),
+    "database": ("DatabaseMCP", [
+        {
+            "name": "query_database",
+            "description": "Execute a database query",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "SQL query to execute"},
+                    "database": {"type": "string", "description": "Database name", "default": "main"}
+                },
+                "required": ["query"]
             }
-        ]
-    }
-    
-    return gateway_client.create_mcp_gateway_target(
+        }
+    ]),
+    "web": ("WebScrapingMCP", [
+        {
+            "name": "scrape_website",
+            "description": "Scrape content from a website",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string", "description": "URL to scrape"},
+                    "selector": {"type": "string", "description": "CSS selector (optional)"}
+                },
+                "required": ["url"]
+            }
+        },
+        {
+            "name": "search_google",
+            "description": "Search Google for information",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Search query"},
+                    "num_results": {"type": "integer", "description": "Number of results", "default": 5}
+                },
+                "required": ["query"]
+            }
+        }
+    ])
+}
+
+def make_target(gateway_client, gateway, name, tools):
+    """Add an MCP server as a Lambda gateway target with the given tool schemas"""
+    return retry_until_iam_ready(
+        gateway_client.create_mcp_gateway_target,
         gateway=gateway,
-        name="WebScrapingMCP",
+        name=name,
         target_type="lambda",
-        target_payload={"toolSchema": web_schema}
+        target_payload={"toolSchema": {"inlinePayload": tools}}
     )
 
 def main():
@@ -126,16 +105,13 @@ def main():
     
     print("🔧 Fixing IAM permissions...")
     client.fix_iam_permissions(gateway)
-    time.sleep(30)  # Wait for IAM propagation
-    
-    print("📁 Adding Filesystem MCP target...")
-    filesystem_target = setup_filesystem_mcp_target(client, gateway)
     
-    print("🗄️ Adding Database MCP target...")
-    database_target = setup_database_mcp_target(client, gateway)
-    
-    print("🌐 Adding Web Scraping MCP target...")
-    web_target = setup_web_mcp_target(client, gateway)
+    # Targets are independent, so create them concurrently
+    print("📁🗄️🌐 Adding Filesystem, Database and Web Scraping MCP targets...")
+    with ThreadPoolExecutor(max_workers=len(TARGETS)) as ex:
+        futures = {key: ex.submit(make_target, client, gateway, name, tools)
+                   for key, (name, tools) in TARGETS.items()}
+    targets = {key: future.result() for key, future in futures.items()}
     
     print("🔑 Getting access token...")
     access_token = client.get_access_token_for_cognito(cognito_response["client_info"])
@@ -145,11 +121,7 @@ def main():
         "gateway_url": gateway["gatewayUrl"],
         "gateway_id": gateway["gatewayId"],
         "access_token": access_token,
-        "targets": {
-            "filesystem": filesystem_target,
-            "database": database_target,
-            "web": web_target
-        }
+        "targets": targets
     }
     
     with open("multi_mcp_config.json", "w") as f: